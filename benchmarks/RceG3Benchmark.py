@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+#-----------------------------------------------------------------------------
+# Title      : RceG3 python benchmark suite
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+#
+# Runs against RceEmulator, no hardware required:
+#
+#    $ python benchmarks/RceG3Benchmark.py --count 1 10 100 --output bench.json
+#
+#-----------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import RceG3
+
+def timeit(func, repeat):
+    """Mean wall time of func in seconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+# Run in a fresh interpreter so no module is already cached
+ImportProbe = '''
+import json, sys, time
+t0 = time.perf_counter()
+import RceG3
+t1 = time.perf_counter()
+RceG3.DpmTiming
+t2 = time.perf_counter()
+print(json.dumps({'package_s': t1 - t0, 'device_s': t2 - t1, 'parse_loaded': 'parse' in sys.modules}))
+'''
+
+# Cold import of the dependencies of a device module, the part of the
+# first device access not spent in RceG3 itself
+DependencyProbe = '''
+import json, time
+t0 = time.perf_counter()
+import numpy, pyrogue, rogue.interfaces.memory
+print(json.dumps({'dependency_s': time.perf_counter() - t0}))
+'''
+
+def benchImport(repeat=5):
+    """Best of repeat cold import times of the package, of one device and of its dependencies"""
+    runs = [json.loads(subprocess.check_output([sys.executable, '-c', ImportProbe])) for _ in range(repeat)]
+    deps = [json.loads(subprocess.check_output([sys.executable, '-c', DependencyProbe])) for _ in range(repeat)]
+    ret = {
+        'package_s'      : min(r['package_s'] for r in runs),
+        'device_s'       : min(r['device_s'] for r in runs),
+        'first_device_s' : min(r['package_s'] + r['device_s'] for r in runs),
+        'dependency_s'   : min(r['dependency_s'] for r in deps),
+        'parse_loaded'   : any(r['parse_loaded'] for r in runs),
+    }
+
+    # Time of the first device access spent in RceG3 modules
+    ret['own_s'] = max(ret['first_device_s'] - ret['dependency_s'], 0.0)
+    return ret
+
+def benchConstruction(count):
+    """Construction time and memory of count instances of each device class"""
+    ret = {}
+    for cls in (RceG3.RceEthernet, RceG3.RceVersion, RceG3.DtmTiming, RceG3.DpmTiming):
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        devs  = [cls(name=f'{cls.__name__}{i}') for i in range(count)]
+        elapsed = time.perf_counter() - start
+        mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del devs
+
+        ret[cls.__name__] = {'time_s': elapsed, 'time_per_device_s': elapsed / count,
+                             'memory_bytes': mem, 'memory_per_device_bytes': mem / count}
+    return ret
+
+def benchRoots(count, latency, repeat, pollTime):
+    """Read latency, poll CPU and link variable cost on count emulated RCEs"""
+    roots = []
+    for i in range(count):
+        timing = 'dtm' if i % 8 == 0 else 'dpm'
+        root = RceG3.RceEmulatorRoot(name=f'Rce{i}', timing=timing, latency=latency,
+                                     location=(i // 8, i % 8, 0), seed=i)
+        root.start()
+        roots.append(root)
+
+    ret = {}
+    try:
+        root = roots[0]
+        ret['read_all_s'] = timeit(lambda: root.ReadAll(), repeat)
+        ret['eth_snapshot_s'] = timeit(lambda: root.RceEthernet.snapshot(), repeat)
+        ret['eth_counters_by_variable_s'] = timeit(
+            lambda: [v.get() for v in root.RceEthernet._counters.variables], repeat)
+
+        ver = root.RceVersion
+        eth = root.RceEthernet
+        ret['link'] = {
+            'MacAddress_s'   : timeit(lambda: eth.MacAddress.get(read=False), repeat * 10),
+            'IpAddress_s'    : timeit(lambda: eth.IpAddress.get(read=False), repeat * 10),
+            'GitHashShort_s' : timeit(lambda: ver.GitHashShort.get(read=False), repeat * 10),
+        }
+        for name in RceG3.BuildStampFields:
+            var = getattr(ver, name)
+            ret['link'][f'{name}_s'] = timeit(lambda: var.get(read=False), repeat * 10)
+
+        # Fleet sweep over all roots
+        with RceG3.RceFleet(roots) as fleet:
+            ret['fleet_sweep_s'] = timeit(fleet.sweep, max(1, repeat // 10))
+
+        # Same reads driven from one event loop
+        async def readAll():
+            await asyncio.gather(*[d.readAsync() for r in roots for d in r.devices.values()])
+        ret['async_sweep_s'] = timeit(lambda: asyncio.run(readAll()), max(1, repeat // 10))
+
+        # Poll loop CPU, polling is enabled for the measurement window only.
+        # The same window counts the updates a DeltaZmqServer would drop.
+        delta = [RceG3.DeltaPublisher(r) for r in roots]
+        for r in roots:
+            r.PollEn.set(True)
+        cpu  = time.process_time()
+        wall = time.perf_counter()
+        time.sleep(pollTime)
+        cpu  = time.process_time() - cpu
+        wall = time.perf_counter() - wall
+        for r in roots:
+            r.PollEn.set(False)
+
+        # Fastest poll interval is one second, so one tick per second
+        ret['poll_cpu_per_tick_s'] = cpu / wall
+
+        sent       = sum(d.filter.sent for d in delta)
+        suppressed = sum(d.filter.suppressed for d in delta)
+        ret['delta'] = {
+            'updates'   : sent + suppressed,
+            'sent'      : sent,
+            'reduction' : (sent + suppressed) / max(sent, 1),
+        }
+    finally:
+        for r in roots:
+            r.stop()
+
+    return ret
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='RceG3 python benchmark suite')
+    parser.add_argument('--count', type=int, nargs='+', default=[1, 10, 100], help='Number of RCEs')
+    parser.add_argument('--latency', type=float, default=0.0, help='Emulated transaction latency (s)')
+    parser.add_argument('--repeat', type=int, default=100, help='Repetitions per measurement')
+    parser.add_argument('--pollTime', type=float, default=5.0, help='Poll measurement window (s)')
+    parser.add_argument('--output', type=str, default=None, help='JSON output file, default stdout')
+    parser.add_argument('--importBudget', type=float, default=0.05,
+                        help='Maximum time of the first device access spent in RceG3 modules (s)')
+    parser.add_argument('--deviceBudget', type=float, default=1.0,
+                        help='Maximum time from import to the first device class, dependencies included (s)')
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'time'     : time.time(),
+            'python'   : sys.version,
+            'platform' : platform.platform(),
+            'version'  : getattr(RceG3, '__version__', None),
+            'args'     : vars(args),
+        },
+        'import': benchImport(),
+        'runs': {},
+    }
+
+    for count in args.count:
+        results['runs'][str(count)] = {
+            'construction' : benchConstruction(count),
+            'roots'        : benchRoots(count, args.latency, args.repeat, args.pollTime),
+        }
+
+    text = json.dumps(results, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+    # Import budget check on the first device class access, which is what
+    # a tool pays before it can do anything. A device import must not load
+    # parse either.
+    imp = results['import']
+    if imp['own_s'] > args.importBudget or imp['first_device_s'] > args.deviceBudget or imp['parse_loaded']:
+        print(f"Import budget exceeded: {imp}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import threading
+import time
+import numpy as np
+import pyrogue as pr
+
+from RceG3._RceFleet import RceFleet, findDevices
+
+def _changed(old, new):
+    try:
+        return bool(old != new)
+    except ValueError:
+        return not np.array_equal(old, new)
+
+class PollGroup(object):
+    """
+    Poll entry with its own activity tracking. control holds the variables
+    whose pollInterval is adjusted, watch those whose changes count as
+    activity. A polled register is a group by itself, for a counter block
+    refreshed by CounterTime control is CounterTime and watch the counters.
+    """
+    def __init__(self, dev, control, watch, interval):
+        self.dev        = dev
+        self.control    = control
+        self.watch      = watch
+        self.base       = interval
+        self.interval   = interval
+        self.lastChange = time.monotonic()
+        self.changed    = False
+
+    @property
+    def name(self):
+        return f'{self.dev.path}.{self.control[0].name}'
+
+    def setInterval(self, interval):
+        if interval != self.interval:
+            self.interval = interval
+            for v in self.control:
+                v.setPollInterval(interval)
+
+class AdaptivePoller(object):
+    """
+    Backs off the poll interval of quiet poll groups of the RceG3 devices
+    of root and restores it as soon as a poll shows a change.
+
+    A group which has not changed for backoff times its current interval
+    has the interval doubled, up to maxInterval. Any change of a watched
+    variable sets the group back to its declared interval immediately.
+    Each device is kept within budget poll reads per second by backing
+    off its longest quiet groups further. Must be created after the root
+    is started.
+
+    Activity is tracked per register, so a quiet register backs off even
+    when it shares its block with one that always changes, such as
+    RxErrors0 and RxIdle0. Such a block is still read at the interval of
+    its fastest register.
+    """
+    def __init__(self, root, maxInterval=30, backoff=5, budget=None, tick=1.0):
+        self.maxInterval = maxInterval
+        self.backoff     = backoff
+        self.budget      = budget
+        self.tick        = tick
+        self.groups      = []
+        self._byPath     = {}
+        self._last       = {}
+        self._lock       = threading.Lock()
+        self._run        = threading.Event()
+        self._thread     = None
+
+        for dev in findDevices(root, RceFleet.DeviceTypes):
+            self._addDevice(dev)
+
+        root.addVarListener(self._varUpdated)
+
+    def _addDevice(self, dev):
+        rates    = getattr(dev, '_rates', None)
+        counters = set(id(v) for v in rates.block.variables) if rates is not None else set()
+
+        for v in dev.variables.values():
+            if v.pollInterval > 0 and not isinstance(v, pr.BaseCommand):
+                if rates is not None and v.name == 'CounterTime':
+                    self._addGroup(dev, [v], list(rates.block.variables), v.pollInterval)
+                elif id(v) not in counters:
+                    self._addGroup(dev, [v], [v], v.pollInterval)
+
+    def _addGroup(self, dev, control, watch, interval):
+        group = PollGroup(dev, control, watch, interval)
+        self.groups.append(group)
+        for v in watch:
+            self._byPath[v.path] = group
+
+    def _varUpdated(self, path, varValue):
+        group = self._byPath.get(path)
+        if group is None:
+            return
+
+        with self._lock:
+            old = self._last.get(path)
+            self._last[path] = varValue.value
+            if old is None or not _changed(old, varValue.value):
+                return
+
+            group.lastChange = time.monotonic()
+            group.changed    = True
+            group.setInterval(group.base)
+
+    def load(self, dev=None):
+        """Poll reads per second of dev, or of all devices, each block at its fastest interval"""
+        blocks = {}
+        for g in self.groups:
+            if dev is None or g.dev is dev:
+                for v in g.control:
+                    key = id(getattr(v, '_block', v))
+                    blocks[key] = min(blocks.get(key, g.interval), g.interval)
+        return sum(1.0 / i for i in blocks.values())
+
+    def update(self):
+        """Back off quiet groups and enforce the budgets, called every tick"""
+        now = time.monotonic()
+        with self._lock:
+            for g in self.groups:
+                if g.changed:
+                    g.changed = False
+                elif now - g.lastChange >= self.backoff * g.interval:
+                    g.setInterval(min(g.interval * 2, self.maxInterval))
+
+            if self.budget is not None:
+                for dev in {id(g.dev): g.dev for g in self.groups}.values():
+                    quiet = sorted((g for g in self.groups if g.dev is dev and g.interval < self.maxInterval),
+                                   key=lambda g: g.lastChange)
+                    while self.load(dev) > self.budget and quiet:
+                        g = quiet[0]
+                        g.setInterval(min(g.interval * 2, self.maxInterval))
+                        if g.interval >= self.maxInterval:
+                            quiet.pop(0)
+
+    def intervals(self):
+        """Current interval of each group by name"""
+        return {g.name: g.interval for g in self.groups}
+
+    def restore(self):
+        """Set every group back to its declared interval"""
+        with self._lock:
+            for g in self.groups:
+                g.setInterval(g.base)
+
+    def start(self):
+        def _loop():
+            while not self._run.wait(self.tick):
+                self.update()
+
+        self._run.clear()
+        self._thread = threading.Thread(target=_loop, name='AdaptivePoller', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop adapting and restore the declared intervals"""
+        if self._thread is not None:
+            self._run.set()
+            self._thread.join()
+            self._thread = None
+        self.restore()
@@ -0,0 +1,175 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import asyncio
+import queue
+import threading
+import pyrogue as pr
+import rogue.interfaces.memory as rim
+
+_lock = threading.Lock()
+
+def _resolve(future, value, error):
+    if not future.cancelled():
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+class TransactionCompleter(object):
+    """
+    Threads which issue and complete the transactions of one root. The
+    start thread starts the transactions of each request, which may block
+    while earlier transactions on the same block are in flight, and the
+    completer thread waits for them in issue order and resolves the asyncio
+    future of each request on its loop. The event loop never blocks and
+    requests to different roots complete independently of each other.
+    """
+    def __init__(self, name):
+        self._starts = queue.SimpleQueue()
+        self._checks = queue.SimpleQueue()
+        self._threads = [
+            threading.Thread(target=self._runStart, name=f'{name}.Starter', daemon=True),
+            threading.Thread(target=self._runCheck, name=f'{name}.Completer', daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    @classmethod
+    def forRoot(cls, root):
+        """Completer shared by all devices of root, created on first use"""
+        with _lock:
+            comp = getattr(root, '_transactionCompleter', None)
+            if comp is None:
+                comp = cls(root.name)
+                root._transactionCompleter = comp
+            return comp
+
+    @classmethod
+    def stopRoot(cls, root):
+        """Stop the completer of root once its queued requests are done"""
+        with _lock:
+            comp = getattr(root, '_transactionCompleter', None)
+            root._transactionCompleter = None
+        if comp is not None:
+            comp.stop()
+
+    def stop(self):
+        self._starts.put(None)
+        for t in self._threads:
+            t.join()
+
+    def submit(self, start, result):
+        """
+        Future resolved with result() once the transactions of the blocks
+        returned by start() have completed. start runs on the start thread.
+        Must be called from the event loop thread.
+        """
+        loop   = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._starts.put((loop, future, start, result))
+        return future
+
+    def _runStart(self):
+        while True:
+            req = self._starts.get()
+            if req is None:
+                self._checks.put(None)
+                return
+
+            loop, future, start, result = req
+            try:
+                blocks = start()
+            except Exception as e:
+                loop.call_soon_threadsafe(_resolve, future, None, e)
+                continue
+            self._checks.put((loop, future, blocks, result))
+
+    def _runCheck(self):
+        while True:
+            req = self._checks.get()
+            if req is None:
+                return
+
+            loop, future, blocks, result = req
+            value = error = None
+            try:
+                for b in blocks:
+                    pr.checkTransaction(b)
+                value = result()
+            except Exception as e:
+                error = e
+
+            loop.call_soon_threadsafe(_resolve, future, value, error)
+
+class AsyncDevice(object):
+    """
+    Awaitable register access, mixed into the RceG3 devices. Transactions
+    are issued and waited for on two threads per root, so the calling
+    coroutine never blocks the event loop and one loop can keep many reads
+    to different RCEs in flight at once. The threads stop with the root.
+    snapshot() and the blocking get()/set() calls are unchanged.
+    """
+    def _stop(self):
+        super()._stop()
+        TransactionCompleter.stopRoot(self.root)
+
+    def _asyncVariables(self, variables):
+        if variables is None:
+            return [v for v in self.variables.values()
+                    if isinstance(v, pr.RemoteVariable) and not isinstance(v, pr.BaseCommand)]
+        return [self.variables[v] if isinstance(v, str) else v for v in variables]
+
+    @staticmethod
+    def _asyncStart(variables, type):
+        blocks = list({id(v._block): v._block for v in variables}.values())
+        for b in blocks:
+            pr.startTransaction(b, type=type)
+        return blocks
+
+    async def readAsync(self, variables=None):
+        """
+        Read variables, names or Variable objects of this device, default
+        all remote registers, and return {name: value}. Each register block
+        is read once.
+        """
+        variables = self._asyncVariables(variables)
+        return await TransactionCompleter.forRoot(self.root).submit(
+            lambda: self._asyncStart(variables, rim.Read),
+            lambda: {v.name: v.value() for v in variables})
+
+    async def writeAsync(self, values):
+        """Write {name or Variable: value}, one transaction per register block"""
+        variables = self._asyncVariables(values.keys())
+        values    = list(values.values())
+
+        def start():
+            for var, value in zip(variables, values):
+                var.set(value, write=False)
+            return self._asyncStart(variables, rim.Write)
+
+        await TransactionCompleter.forRoot(self.root).submit(start, lambda: None)
+
+    async def snapshotAsync(self):
+        """
+        CounterSnapshot of the device counters if it has a counter block,
+        otherwise the values of all remote registers as from readAsync().
+        """
+        counters = getattr(self, '_counters', None)
+        if counters is None:
+            return await self.readAsync()
+
+        blocks = []
+        def start():
+            blocks.extend(counters.startRefresh())
+            return []
+
+        return await TransactionCompleter.forRoot(self.root).submit(
+            start, lambda: counters.checkRefresh(blocks))
@@ -0,0 +1,112 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import concurrent.futures
+import math
+import time
+
+def wilson(k, n, z=1.96):
+    """Wilson score interval (low, high) of the proportion k/n"""
+    if n == 0:
+        return (0.0, 1.0)
+    p = k / n
+    d = 1 + z*z/n
+    c = (p + z*z/(2*n)) / d
+    h = z * math.sqrt(p*(1-p)/n + z*z/(4*n*n)) / d
+    return (max(0.0, c - h), min(1.0, c + h))
+
+class BerLink(object):
+    """Result of one DTM channel to DPM input link"""
+    def __init__(self, path, channel, sent, received, errors, saturated, z):
+        self.path      = path
+        self.channel   = channel
+        self.sent      = sent
+        self.received  = received
+        self.lost      = max(sent - received, 0)
+        self.errors    = errors
+        self.saturated = saturated  # RxErrors reached 0xFFFF, errors is a lower bound
+
+        self.lossRate    = self.lost / sent if sent else 0.0
+        self.lossBounds  = wilson(self.lost, sent, z)
+        self.errorRate   = errors / received if received else 0.0
+        self.errorBounds = wilson(errors, received, z)
+
+    def asDict(self):
+        return dict(vars(self))
+
+class BerTester(object):
+    """
+    Timing link bit error test. A DtmTiming transmits an opcode on one or
+    both channels and every DpmTiming counts what its matching input
+    receives. Channel i of the DTM is expected on input i of each DPM.
+
+    Before and after each run the DTM TxCount words and, per DPM, the words
+    0x0C-0x2B holding RxErrors/RxIdle and RxCount are read with one burst
+    each, the DPMs in parallel. Loss and error rates per opcode come with
+    Wilson score bounds at z standard deviations.
+    """
+    def __init__(self, dtm, dpms, channels=(0, 1), maxWorkers=16, z=1.96):
+        self.dtm      = dtm
+        self.dpms     = list(dpms)
+        self.channels = tuple(channels)
+        self.z        = z
+        self._pool    = concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='BerTester')
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _readDpm(dpm):
+        w = dpm._rawRead(offset=0x0C, numWords=8)
+        # (RxErrors, RxCount) per input
+        return [(w[0] >> 16, w[6]), (w[4] >> 16, w[7])]
+
+    def _snapshot(self):
+        tx  = self.dtm._rawRead(offset=0x414, numWords=2)
+        rx  = list(self._pool.map(self._readDpm, self.dpms))
+        return tx, rx
+
+    def run(self, count, opcode=0x0A5, chunk=4096, settle=0.05):
+        """
+        Send count opcodes on each channel and return a list of BerLink,
+        one per DPM input. settle is the time allowed for the last opcodes
+        to arrive before the counters are read.
+        """
+        tx0, rx0 = self._snapshot()
+
+        for ch in self.channels:
+            self.dtm.sendCommands(ch, opcode, count, chunk)
+        time.sleep(settle)
+
+        tx1, rx1 = self._snapshot()
+
+        ret = []
+        for dpm, before, after in zip(self.dpms, rx0, rx1):
+            for ch in self.channels:
+                sent     = (tx1[ch] - tx0[ch]) & 0xFFFFFFFF
+                received = (after[ch][1] - before[ch][1]) & 0xFFFFFFFF
+                errors   = max(after[ch][0] - before[ch][0], 0)
+                ret.append(BerLink(dpm.path, ch, sent, received, errors, after[ch][0] == 0xFFFF, self.z))
+        return ret
+
+    @staticmethod
+    def table(links):
+        """Text table of run() results"""
+        rows = [f"{'Link':40} {'Ch':>2} {'Sent':>12} {'Lost':>10} {'Loss <=':>10} {'Errors':>8} {'Err <=':>10}"]
+        for link in links:
+            rows.append(f"{link.path:40} {link.channel:2d} {link.sent:12d} {link.lost:10d} {link.lossBounds[1]:10.2e} "
+                        f"{link.errors:8d}{'+' if link.saturated else ' '}{link.errorBounds[1]:10.2e}")
+        return '\n'.join(rows)
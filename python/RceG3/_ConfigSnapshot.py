@@ -0,0 +1,168 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import collections
+import concurrent.futures
+import json
+import time
+import numpy as np
+import pyrogue as pr
+
+from RceG3._RceFleet import RceFleet, findDevices
+
+# Configuration registers saved and restored per device class. Variable
+# arrays are listed by their base name, e.g. FbDelay for FbDelay[0-7].
+# Counters, resets and registers owned by the kernel drivers are left out
+# even where they are writable.
+ConfigRegisters = {
+    'DtmTiming'   : ('FbDelay',),
+    'DpmTiming'   : ('RxDelay0', 'RxDelay1'),
+    'RceEthernet' : ('IpAddressRaw',),
+    'RceVersion'  : ('ScratchPad',),
+}
+
+class RwLayout(object):
+    """
+    Register words holding the configuration registers of a device, names
+    or by default its ConfigRegisters entry, grouped in contiguous regions.
+    masks holds the configuration bits of each word, so other fields
+    sharing a word are never compared or written.
+    """
+    def __init__(self, dev, names=None):
+        if names is None:
+            names = ConfigRegisters.get(type(dev).__name__, ())
+
+        self.variables = [v for v in dev.variables.values()
+                          if isinstance(v, pr.RemoteVariable) and not isinstance(v, pr.BaseCommand)
+                          and (v.name in names or v.name.split('[')[0] in names)]
+
+        masks = collections.defaultdict(int)
+        self.owners = collections.defaultdict(list)  # Word offset -> variables
+        for v in self.variables:
+            words = set()
+            for bitOffset, bitSize in zip(v.bitOffset, v.bitSize):
+                for bit in range(bitOffset, bitOffset + bitSize):
+                    pos  = v.offset*8 + bit
+                    word = (pos // 32) * 4
+                    masks[word] |= 1 << (pos % 32)
+                    words.add(word)
+            for word in words:
+                self.owners[word].append(v)
+
+        # (offset, masks) per contiguous run of words
+        self.regions = []
+        for word in sorted(masks):
+            if self.regions and self.regions[-1][0] + 4*len(self.regions[-1][1]) == word:
+                self.regions[-1][1].append(masks[word])
+            else:
+                self.regions.append((word, [masks[word]]))
+        self.regions = [(offset, np.array(m, dtype=np.uint32)) for offset, m in self.regions]
+
+    def read(self, dev):
+        """Current words of each region, one burst read per region"""
+        ret = []
+        for offset, masks in self.regions:
+            data = dev._rawRead(offset=offset, numWords=len(masks))
+            ret.append(np.array(data if len(masks) > 1 else [data], dtype=np.uint32))
+        return ret
+
+class ConfigSnapshot(object):
+    """
+    Configuration register contents, see ConfigRegisters, of the RceG3
+    devices of one or more roots, saved as a compact JSON file keyed by
+    device path. restore() reads each region once and writes only the
+    words whose configuration bits differ, merging neighbouring words into
+    one burst. Devices without configuration registers are skipped.
+    """
+    Version = 2
+
+    def __init__(self, devices=None):
+        self.devices = devices or {}  # path -> {'class': name, 'regions': [[offset, words, masks]]}
+
+    @staticmethod
+    def _devices(roots):
+        return [d for r in roots for d in findDevices(r, RceFleet.DeviceTypes)
+                if type(d).__name__ in ConfigRegisters]
+
+    @classmethod
+    def capture(cls, roots, maxWorkers=16):
+        """Read the configuration registers of all RceG3 devices below roots"""
+        def _capture(dev):
+            layout = RwLayout(dev)
+            words  = layout.read(dev)
+            return dev.path, {
+                'class'   : type(dev).__name__,
+                'regions' : [[offset, w.tolist(), m.tolist()] for (offset, m), w in zip(layout.regions, words)],
+            }
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+            return cls(dict(pool.map(_capture, cls._devices(roots))))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'version': self.Version, 'time': time.time(), 'devices': self.devices}, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != cls.Version:
+            raise ValueError(f'{path}: unsupported config snapshot version {data.get("version")}')
+        return cls(data['devices'])
+
+    def _restoreDevice(self, dev, dryRun):
+        saved = self.devices.get(dev.path)
+        if saved is None:
+            return {'device': dev.path, 'error': 'not in snapshot'}
+        if saved['class'] != type(dev).__name__:
+            return {'device': dev.path, 'error': f"snapshot holds a {saved['class']}"}
+
+        layout  = RwLayout(dev)
+        changed = {}
+        writes  = 0
+
+        for offset, words, masks in saved['regions']:
+            words = np.array(words, dtype=np.uint32)
+            masks = np.array(masks, dtype=np.uint32)
+            data  = dev._rawRead(offset=offset, numWords=len(words))
+            cur   = np.array(data if len(words) > 1 else [data], dtype=np.uint32)
+            new   = (cur & ~masks) | (words & masks)
+            diff  = np.flatnonzero((cur ^ new) != 0)
+
+            # Contiguous runs of differing words, one write burst each
+            for run in (np.split(diff, np.flatnonzero(np.diff(diff) != 1) + 1) if len(diff) else []):
+                for i in run:
+                    word = offset + 4*int(i)
+                    for v in layout.owners.get(word, []):
+                        changed.setdefault(v.name, []).append((word, int(cur[i]), int(new[i])))
+                if not dryRun:
+                    start = offset + 4*int(run[0])
+                    dev._rawWrite(offset=start, data=[int(x) for x in new[run]] if len(run) > 1 else int(new[run[0]]))
+                writes += 1
+
+        # Bring the shadow values of the written variables up to date
+        if changed and not dryRun:
+            variables = [dev.variables[n] for n in changed]
+            for v in variables:
+                dev.readBlocks(recurse=False, variable=v)
+            for v in variables:
+                dev.checkBlocks(recurse=False, variable=v)
+
+        return {'device': dev.path, 'changed': changed, 'writes': writes}
+
+    def restore(self, roots, dryRun=False, maxWorkers=16):
+        """
+        Restore the configuration registers of the devices below roots which
+        are in the snapshot. Returns one report per device with the changed variables
+        as name -> [(word offset, old word, new word)] and the number of
+        write bursts. With dryRun nothing is written.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+            return list(pool.map(lambda d: self._restoreDevice(d, dryRun), self._devices(roots)))
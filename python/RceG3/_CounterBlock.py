@@ -0,0 +1,163 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import time
+import functools
+import numpy as np
+import pyrogue as pr
+import rogue.interfaces.memory as rim
+
+class CounterSnapshot(object):
+    """Timestamped copy of a counter block, values held in a uint32 array"""
+    def __init__(self, block, values, timestamp):
+        self.block     = block
+        self.values    = values
+        self.timestamp = timestamp
+
+    @property
+    def names(self):
+        return self.block.names
+
+    @property
+    def record(self):
+        # Named field view sharing memory with self.values
+        return self.values.view(self.block.dtype)[0]
+
+    def __getitem__(self, name):
+        return int(self.values[self.block.index[name]])
+
+    def __len__(self):
+        return len(self.values)
+
+    def asDict(self):
+        return {n: int(v) for n, v in zip(self.block.names, self.values)}
+
+
+class CounterLayout(object):
+    """
+    Decode layout of a set of counter fields, each (name, offset, bitOffset,
+    bitSize). Layouts are immutable and shared through counterLayout().
+    """
+    def __init__(self, fields):
+        self.names  = tuple(f[0] for f in fields)
+        self.index  = {n: i for i, n in enumerate(self.names)}
+        self.dtype  = np.dtype([(n, np.uint32) for n in self.names])
+
+        # Absolute bit position of each field in the register space
+        bitPos  = [offset*8 + bitOffset for _, offset, bitOffset, _ in fields]
+        bitSize = [f[3] for f in fields]
+
+        # Group the touched 32-bit words into contiguous windows
+        windows = []
+        for w in sorted({p // 32 for p in bitPos}):
+            if windows and windows[-1][1] == w:
+                windows[-1][1] = w + 1
+            else:
+                windows.append([w, w + 1])
+        self.windows = tuple((start, stop) for start, stop in windows)
+
+        # Index of each field in the concatenated word array
+        base = {}
+        pos  = 0
+        for start, stop in self.windows:
+            for w in range(start, stop):
+                base[w] = pos
+                pos += 1
+
+        self.numWords = pos
+        self.bitSize  = np.array(bitSize, dtype=np.uint32)
+        self.wordIdx  = np.array([base[p // 32] for p in bitPos], dtype=np.intp)
+        self.shift    = np.array([p % 32 for p in bitPos], dtype=np.uint32)
+        self.mask     = np.array([(1 << s) - 1 for s in bitSize], dtype=np.uint32)
+
+        for a in (self.bitSize, self.wordIdx, self.shift, self.mask):
+            a.setflags(write=False)
+
+def resetCommand(dev, function):
+    """
+    Function for a counter reset command of dev, runs the command function,
+    e.g. pr.RemoteCommand.touchOne, then marks dev._counters as cleared.
+    """
+    def _reset(cmd):
+        function(cmd)
+        dev._counters.markReset()
+    return _reset
+
+@functools.lru_cache(maxsize=None)
+def counterLayout(fields):
+    """Shared CounterLayout for a tuple of fields"""
+    return CounterLayout(fields)
+
+class CounterBlock(object):
+    """
+    Set of counter variables read with one burst transaction per
+    contiguous window of 32-bit registers instead of one per variable.
+    The decode layout is shared by all blocks with the same fields.
+    saturating names the counters which stop at their maximum instead of
+    rolling over.
+    """
+    def __init__(self, variables, saturating=()):
+        self.variables = tuple(variables)
+        self.layout = counterLayout(tuple((v.name, v.offset, v.bitOffset[0], v.bitSize[0]) for v in variables))
+
+        for attr in ('names', 'index', 'dtype', 'bitSize', 'windows', 'numWords', 'wordIdx', 'shift', 'mask'):
+            setattr(self, attr, getattr(self.layout, attr))
+
+        self.saturating = np.array([n in saturating for n in self.names], dtype=bool)
+
+        # Number of hardware counter resets, see markReset()
+        self.resets = 0
+
+    def markReset(self):
+        """
+        Record that the hardware counters were cleared, so every CounterRates
+        of this block counts from zero on its next update instead of taking
+        the drop for a wrap.
+        """
+        self.resets += 1
+
+    def read(self, dev):
+        """Read all windows from the device and return a CounterSnapshot"""
+        words = np.empty(self.numWords, dtype=np.uint32)
+        pos = 0
+        for start, stop in self.windows:
+            num  = stop - start
+            data = dev._rawRead(offset=start*4, numWords=num)
+            words[pos:pos+num] = data if num > 1 else [data]
+            pos += num
+
+        return CounterSnapshot(self, self.decode(words), time.time())
+
+    def startRefresh(self):
+        """Start the reads of the counter variable blocks without waiting"""
+        blocks = list({id(v._block): v._block for v in self.variables}.values())
+        for b in blocks:
+            pr.startTransaction(b, type=rim.Read)
+        return blocks
+
+    def checkRefresh(self, blocks):
+        """Wait for the reads started by startRefresh, returns a CounterSnapshot"""
+        for b in blocks:
+            pr.checkTransaction(b)
+
+        values = np.fromiter((v.value() for v in self.variables), dtype=np.uint32, count=len(self.variables))
+        return CounterSnapshot(self, values, time.time())
+
+    def refresh(self):
+        """
+        Read the counter variables through their normal blocks so the
+        variable values are updated, and return a CounterSnapshot of them.
+        Each block is read once, even when it holds several counters.
+        """
+        return self.checkRefresh(self.startRefresh())
+
+    def decode(self, words):
+        """Extract the counter fields from the raw register words"""
+        return (words[self.wordIdx] >> self.shift) & self.mask
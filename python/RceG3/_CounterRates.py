@@ -0,0 +1,132 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+import pyrogue as pr
+
+def rateName(name):
+    """Name of the rate variable for a counter, keeps array indexes last"""
+    if name.endswith(']'):
+        base, idx = name[:-1].split('[')
+        return f'{base}Rate[{idx}]'
+    return f'{name}Rate'
+
+class CounterRates(object):
+    """
+    Software 64-bit accumulators and event rates for the hardware counters
+    of a CounterBlock. Wraps are detected using the declared bitSize of
+    each counter, all counters are updated in one numpy pass. Saturating
+    counters of the block never wrap, a counter held at its maximum adds
+    nothing and is flagged in saturated. A reset of the hardware counters
+    is recognised when it is recorded with CounterBlock.markReset(), as the
+    CountReset commands do.
+    """
+    def __init__(self, block):
+        self.block = block
+        self._mask = block.mask.astype(np.uint64)
+        self._sat  = block.saturating
+        self._listeners = []
+        self.reset()
+
+    def reset(self):
+        """Restart accumulation, the next update only sets the baseline"""
+        self.total = np.zeros(len(self.block.names), dtype=np.uint64)
+        self.rate  = np.zeros(len(self.block.names), dtype=np.float64)
+        self.delta = np.zeros(len(self.block.names), dtype=np.uint64)
+        self.saturated = np.zeros(len(self.block.names), dtype=bool)
+        self.dt    = 0.0
+        self._last = None
+        self._time = None
+        self._resets = self.block.resets
+
+    def update(self, snapshot):
+        """Accumulate the deltas since the previous snapshot, returns the rates"""
+        cur = snapshot.values.astype(np.uint64)
+
+        # The hardware counters were cleared since the last snapshot, they
+        # count from zero rather than from the last values
+        if self._resets != self.block.resets:
+            self._resets = self.block.resets
+            if self._last is not None:
+                self._last = np.zeros_like(cur)
+
+        if self._last is None:
+            self.total[:] = cur
+        else:
+            # Modular difference handles a single wrap of each counter, a
+            # saturating counter which dropped was cleared and counts from zero
+            delta = np.where(self._sat,
+                             np.where(cur >= self._last, cur - self._last, cur),
+                             (cur - self._last) & self._mask)
+            self.total += delta
+
+            dt = snapshot.timestamp - self._time
+            if dt > 0:
+                self.rate  = delta / dt
+                self.delta = delta
+                self.dt    = dt
+
+        self.saturated = self._sat & (cur == self._mask)
+        self._last = cur
+        self._time = snapshot.timestamp
+        return self.rate
+
+    def totals(self):
+        return {n: int(v) for n, v in zip(self.block.names, self.total)}
+
+    def rates(self):
+        return {n: float(v) for n, v in zip(self.block.names, self.rate)}
+
+    def addVariables(self, dev, pollInterval=0):
+        """
+        Add a rate variable next to each counter of dev, plus a CounterTime
+        variable which refreshes the counters and rates when read. It is
+        only polled with a pollInterval, otherwise the rates are updated by
+        reading CounterTime or calling poll().
+        """
+        self.pollInterval = pollInterval
+        self._rateVars = []
+        for name in self.block.names:
+            var = pr.LocalVariable(
+                name        = rateName(name),
+                description = f'{name} rate',
+                mode        = 'RO',
+                value       = 0.0,
+                units       = 'Hz',
+                disp        = '{:.1f}')
+            dev.add(var)
+            self._rateVars.append(var)
+
+        dev.add(pr.LocalVariable(
+            name         = 'CounterTime',
+            description  = 'Time of the last counter rate update',
+            mode         = 'RO',
+            value        = 0.0,
+            units        = 's',
+            hidden       = True,
+            pollInterval = pollInterval,
+            localGet     = self.poll))
+
+    def poll(self):
+        """Refresh the counters, then update the accumulators and rate variables"""
+        snapshot = self.block.refresh()
+        self.update(snapshot)
+
+        for var, rate in zip(self._rateVars, self.rate):
+            var.set(float(rate))
+
+        for func in self._listeners:
+            func(self)
+
+        return snapshot.timestamp
+
+    def addListener(self, func):
+        """Call func(self) after each poll, once delta and dt are updated"""
+        self._listeners.append(func)
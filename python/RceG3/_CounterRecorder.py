@@ -0,0 +1,146 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import os
+import json
+import threading
+import numpy as np
+
+class CounterRecorder(object):
+    """
+    Memory mapped ring file of counter snapshots. Each record is a float64
+    timestamp followed by one uint32 per counter, written in place as one
+    record copy with no Python objects. When the ring is full the oldest
+    records are overwritten.
+
+    The header holds the total number of records written, the ring position
+    and fill level both derive from it. A sample is published by a single
+    store of that count after its record is written, so a reader never
+    sees a partly written record. It may still see the oldest record
+    being overwritten when it reads a full ring while a writer appends.
+
+    Open an existing file by passing only the path, readers may use
+    mode='r' while a writer process appends to the same file.
+    """
+    Magic      = b'RCEG3REC'
+    HeaderSize = 4096
+
+    _header = np.dtype([('magic', 'S8'), ('version', '<u4'), ('width', '<u4'),
+                        ('capacity', '<u8'), ('written', '<u8'), ('namesLen', '<u4')])
+
+    Version = 2
+
+    def __init__(self, path, names=None, capacity=864000, mode='r+'):
+        self.path = path
+
+        if names is not None and not os.path.exists(path):
+            self._create(path, list(names), capacity)
+
+        hdr = np.memmap(path, dtype=self._header, mode=mode, shape=(1,))
+        if hdr['magic'][0] != self.Magic:
+            raise ValueError(f'{path} is not a counter recorder file')
+        if hdr['version'][0] != self.Version:
+            raise ValueError(f'{path} has unsupported counter recorder version {hdr["version"][0]}')
+
+        start = self._header.itemsize
+        names = json.loads(bytes(np.memmap(path, dtype=np.uint8, mode='r', offset=start,
+                                           shape=(int(hdr['namesLen'][0]),))))
+
+        self._hdr     = hdr
+        self.names    = tuple(names)
+        self.capacity = int(hdr['capacity'][0])
+        self.dtype    = np.dtype([('timestamp', '<f8'), ('values', '<u4', (len(names),))])
+        self._records = np.memmap(path, dtype=self.dtype, mode=mode, offset=self.HeaderSize, shape=(self.capacity,))
+        self._thread  = None
+        self._run     = threading.Event()
+
+    def _create(self, path, names, capacity):
+        enc = json.dumps(names).encode()
+        if self._header.itemsize + len(enc) > self.HeaderSize:
+            raise ValueError('Too many counter names for the file header')
+
+        hdr = np.zeros(1, dtype=self._header)
+        hdr['magic']    = self.Magic
+        hdr['version']  = self.Version
+        hdr['width']    = len(names)
+        hdr['capacity'] = capacity
+        hdr['namesLen'] = len(enc)
+
+        # Pre-size the whole ring so appends never grow the file
+        with open(path, 'wb') as f:
+            f.write(hdr.tobytes() + enc)
+            f.truncate(self.HeaderSize + capacity * (8 + 4*len(names)))
+
+    def __len__(self):
+        return min(int(self._hdr['written'][0]), self.capacity)
+
+    def append(self, values, timestamp):
+        """Store one sample, values is a uint32 array in the order of names"""
+        written = int(self._hdr['written'][0])
+        self._records[written % self.capacity] = (timestamp, values)
+
+        # Publish the record with one 8-byte store
+        self._hdr['written'][0] = written + 1
+
+    def record(self, snapshot):
+        """Store a CounterSnapshot"""
+        self.append(snapshot.values, snapshot.timestamp)
+
+    def _segments(self):
+        """Views of the stored records in time order, at most two"""
+        written = int(self._hdr['written'][0])
+        head    = written % self.capacity
+
+        if written < self.capacity:
+            return [self._records[:written]]
+        return [self._records[head:], self._records[:head]]
+
+    def read(self, start=None, stop=None):
+        """
+        Return (timestamps, values) for start <= timestamp < stop. The result
+        is a view into the file unless the range spans the ring wrap point.
+        """
+        parts = []
+        for seg in self._segments():
+            times = seg['timestamp']
+            lo = 0 if start is None else np.searchsorted(times, start, side='left')
+            hi = len(seg) if stop is None else np.searchsorted(times, stop, side='left')
+            if hi > lo:
+                parts.append(seg[lo:hi])
+
+        if len(parts) == 0:
+            rec = self._records[:0]
+        elif len(parts) == 1:
+            rec = parts[0]
+        else:
+            rec = np.concatenate(parts)
+
+        return rec['timestamp'], rec['values']
+
+    def flush(self):
+        self._records.flush()
+        self._hdr.flush()
+
+    def start(self, device, period=1.0):
+        """Record device.snapshot() every period seconds in a background thread"""
+        def _loop():
+            while not self._run.wait(period):
+                self.record(device.snapshot())
+
+        self._run.clear()
+        self._thread = threading.Thread(target=_loop, name='CounterRecorder', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._run.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
@@ -0,0 +1,162 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import collections
+import threading
+
+from RceG3._RceFleet   import findDevices
+from RceG3._RceBsi     import RceBsi
+from RceG3._RceVersion import RceVersion
+
+RceEntry = collections.namedtuple('RceEntry', 'crate slot bay element dna root')
+
+def readIdentity(root, refresh=False):
+    """
+    (slot, bay, element, dna) of root from the session cached BSI values and
+    DeviceDna, the registers are only read when refresh is set or no value
+    is cached yet.
+    """
+    bsi = findDevices(root, (RceBsi, RceVersion))
+    ver = findDevices(root, RceVersion)
+    if not bsi:
+        raise ValueError(f'{root.name} has no RceBsi or RceVersion')
+
+    dev = bsi[0]
+    if refresh or dev.SerialNumber.value() == 0:
+        if isinstance(dev, RceBsi):
+            dev.refresh()
+        else:
+            dev.refreshBsi()
+
+    dna = None
+    if ver:
+        dna = ver[0].DeviceDna.value()
+        if refresh or dna == 0:
+            dna = ver[0].DeviceDna.get()
+
+    return dev.AtcaSlot.value(), dev.CobBay.value(), dev.CobElement.value(), dna
+
+class CrateTopology(object):
+    """
+    Index of RCE roots by (crate, slot, bay, element) and by DeviceDna.
+    Lookups are dict accesses and group selections touch only the members
+    of the smallest matching group. Roots are added, updated and removed
+    one at a time, e.g. from a HeartBeatWatchdog through onWatchdogChange.
+    crate is a free label for multi-crate systems, None for a single crate.
+    """
+    Fields = ('crate', 'slot', 'bay', 'element')
+
+    def __init__(self, roots=(), crate=None):
+        self._lock   = threading.RLock()
+        self._byLoc  = {}  # (crate, slot, bay, element) -> RceEntry
+        self._byDna  = {}
+        self._byRoot = {}  # id(root) -> RceEntry
+        self._crates = {}  # id(root) -> crate label, kept while a root is removed
+        self._groups = {f: collections.defaultdict(set) for f in self.Fields}
+
+        for root in roots:
+            self.update(root, crate=crate)
+
+    def __len__(self):
+        return len(self._byLoc)
+
+    def __iter__(self):
+        return iter(list(self._byLoc.values()))
+
+    def _remove(self, entry):
+        loc = entry[:4]
+        if self._byLoc.get(loc) is entry:
+            del self._byLoc[loc]
+            for f, v in zip(self.Fields, loc):
+                self._groups[f][v].discard(loc)
+                if not self._groups[f][v]:
+                    del self._groups[f][v]
+        if entry.dna is not None and self._byDna.get(entry.dna) is entry:
+            del self._byDna[entry.dna]
+        if self._byRoot.get(id(entry.root)) is entry:
+            del self._byRoot[id(entry.root)]
+
+    def update(self, root, crate=None, refresh=False):
+        """
+        Add root or move it to its current location, returns its RceEntry.
+        Without crate the label of an earlier update of root is kept.
+        """
+        crate = self._crates.get(id(root)) if crate is None else crate
+        self._crates[id(root)] = crate
+        slot, bay, element, dna = readIdentity(root, refresh)
+        entry = RceEntry(crate, slot, bay, element, dna, root)
+
+        with self._lock:
+            old = self._byRoot.get(id(root))
+            if old is not None:
+                self._remove(old)
+
+            # A board now at this location or with this DNA replaces the old one
+            for prev in (self._byLoc.get(entry[:4]), self._byDna.get(dna)):
+                if prev is not None:
+                    self._remove(prev)
+
+            self._byLoc[entry[:4]] = entry
+            self._byRoot[id(root)] = entry
+            if dna is not None:
+                self._byDna[dna] = entry
+            for f, v in zip(self.Fields, entry[:4]):
+                self._groups[f][v].add(entry[:4])
+
+        return entry
+
+    def remove(self, root):
+        """Drop root, e.g. when its board disappears"""
+        with self._lock:
+            entry = self._byRoot.get(id(root))
+            if entry is not None:
+                self._remove(entry)
+            return entry
+
+    def find(self, slot, bay, element, crate=None):
+        """RceEntry at a location or None"""
+        return self._byLoc.get((crate, slot, bay, element))
+
+    def findDna(self, dna):
+        return self._byDna.get(dna)
+
+    def select(self, **kwargs):
+        """
+        Entries matching all given fields, e.g. select(bay=3) or
+        select(crate='B', slot=2), sorted by location.
+        """
+        for f in kwargs:
+            if f not in self.Fields:
+                raise ValueError(f'Unknown topology field {f}')
+
+        with self._lock:
+            if not kwargs:
+                keys = set(self._byLoc)
+            else:
+                sets = sorted((self._groups[f].get(v, set()) for f, v in kwargs.items()), key=len)
+                keys = sets[0].intersection(*sets[1:])
+            return [self._byLoc[k] for k in sorted(keys, key=lambda k: ('' if k[0] is None else str(k[0]),) + k[1:])]
+
+    def roots(self, **kwargs):
+        """Roots of select(**kwargs), for bulk operations on a group"""
+        return [e.root for e in self.select(**kwargs)]
+
+    def onWatchdogChange(self, target, old, new):
+        """
+        HeartBeatWatchdog onChange handler. A stalled board is removed and a
+        board which comes back or restarts is read again, as it may have been
+        swapped.
+        """
+        root  = target.root
+        entry = self._byRoot.get(id(root))
+        if new == 'Stalled':
+            self.remove(root)
+        elif new == 'Restarted' or (new == 'Alive' and (entry is None or old == 'Stalled')):
+            self.update(root, refresh=True)
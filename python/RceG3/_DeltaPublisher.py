@@ -0,0 +1,146 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import threading
+import time
+import numpy as np
+import pyrogue as pr
+import pyrogue.interfaces
+
+from RceG3._RceFleet import findDevices
+
+def _changed(old, new, deadband):
+    if isinstance(new, float) and isinstance(old, float):
+        return abs(new - old) > deadband
+    try:
+        return bool(old != new)
+    except ValueError:
+        # Array values
+        return not np.array_equal(old, new)
+
+class DeltaFilter(object):
+    """Last published value of each variable path, drops unchanged updates"""
+    def __init__(self, deadband=0.0):
+        self.deadband   = deadband
+        self.published  = {}  # Variable path -> last published value
+        self.sent       = 0   # Values passed
+        self.suppressed = 0   # Unchanged values dropped
+
+    def changed(self, path, value):
+        """True if value must be published, it is then recorded as published"""
+        if path in self.published and not _changed(self.published[path], value, self.deadband):
+            self.suppressed += 1
+            return False
+        self.published[path] = value
+        self.sent += 1
+        return True
+
+    def reduction(self):
+        """Updates offered per update published"""
+        return (self.sent + self.suppressed) / max(self.sent, 1)
+
+class DeltaZmqServer(pyrogue.interfaces.ZmqServer):
+    """
+    ZmqServer which publishes only the variables whose value changed since
+    they were last published, use it in place of the default server of a
+    root:
+
+        self.zmqServer = RceG3.DeltaZmqServer(root=self, addr='*', port=0)
+        self.addInterface(self.zmqServer)
+
+    Clients read the current values when they connect, so they need no
+    resync. Float values within deadband of the published value are not
+    sent again, see filter for the counts.
+    """
+    def __init__(self, *, deadband=0.0, **kwargs):
+        self.filter = DeltaFilter(deadband)
+        self._filterLock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def _varUpdate(self, path, value):
+        with self._filterLock:
+            if not self.filter.changed(path, value.value):
+                return
+        super()._varUpdate(path, value)
+
+class DeltaPublisher(object):
+    """
+    Forwards only the variable values of root which changed since they were
+    last published to in-process subscribers, see DeltaZmqServer for the
+    remote clients. Updates are collected from the root variable listener
+    and sent when the root signals the end of an update batch, as one
+    message per device:
+
+        {'device': path, 'time': t, 'full': False, 'values': {name: value}}
+
+    A new subscriber first receives a full message for every device with
+    the current values, then the deltas. Float values within deadband of
+    the published value are not sent again.
+    """
+    def __init__(self, root, deadband=0.0):
+        self._root        = root
+        self._lock        = threading.Lock()
+        self._subscribers = []
+        self._pending     = {}  # Device path -> {name: value}
+        self.filter       = DeltaFilter(deadband)
+
+        root.addVarListener(self._varUpdated, done=self._flush)
+
+    def _varUpdated(self, path, varValue):
+        value = varValue.value
+        with self._lock:
+            if not self.filter.changed(path, value):
+                return
+            dev, name = path.rsplit('.', 1)
+            self._pending.setdefault(dev, {})[name] = value
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            now = time.time()
+            for dev, values in pending.items():
+                self._send(self._subscribers, {'device': dev, 'time': now, 'full': False, 'values': values})
+
+    def _send(self, subscribers, msg):
+        for func in subscribers:
+            try:
+                func(msg)
+            except Exception:
+                self._root._log.exception(f'DeltaPublisher subscriber {func} failed')
+
+    def _fullState(self):
+        """Current cached values of every variable, one message per device"""
+        now = time.time()
+        for dev in [self._root] + findDevices(self._root, pr.Device):
+            values = {v.name: v.value() for v in dev.variables.values() if not isinstance(v, pr.BaseCommand)}
+            if values:
+                yield {'device': dev.path, 'time': now, 'full': True, 'values': values}
+
+    def subscribe(self, func):
+        """Call func(msg) for each update message, starting with a full resync"""
+        with self._lock:
+            for msg in self._fullState():
+                for name, value in msg['values'].items():
+                    self.filter.published.setdefault(f"{msg['device']}.{name}", value)
+                self._send([func], msg)
+            self._subscribers.append(func)
+
+    def unsubscribe(self, func):
+        with self._lock:
+            self._subscribers.remove(func)
+
+    def resync(self, func):
+        """Send a full resync to an existing subscriber, e.g. after it reconnects"""
+        with self._lock:
+            for msg in self._fullState():
+                self._send([func], msg)
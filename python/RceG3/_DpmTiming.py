@@ -8,9 +8,17 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import time
+import numpy as np
 import pyrogue as pr
 
-class DpmTiming(pr.Device):
+from RceG3._AsyncDevice import AsyncDevice
+from RceG3._CounterBlock import CounterBlock, resetCommand
+from RceG3._CounterRates import CounterRates
+from RceG3._PollCoalescer import coalescePolls
+from RceG3._EyeScan      import EyeScan, EyeScanTaps
+
+class DpmTiming(AsyncDevice, pr.Device):
     def __init__(self, **kwargs):
         super(self.__class__, self).__init__(
             description="RCE DPM Timing Registers.", **kwargs)
@@ -86,7 +94,7 @@ class DpmTiming(pr.Device):
         self.add(pr.RemoteCommand(
             name='CountReset',
             offset=0x20,
-            function=pr.RemoteCommand.touchOne,
+            function=resetCommand(self, pr.RemoteCommand.touchOne),
         ))
 
         self.add(pr.RemoteVariable(
@@ -95,8 +103,7 @@ class DpmTiming(pr.Device):
             offset=0x24,
             bitSize=32,
             bitOffset=0,
-            mode='RO',
-            pollInterval=1))
+            mode='RO'))
 
         self.add(pr.RemoteVariable(
             name='RxCount1',
@@ -104,20 +111,60 @@ class DpmTiming(pr.Device):
             offset=0x28,
             bitSize=32,
             bitOffset=0,
-            mode='RO',
-            pollInterval=1))
+            mode='RO'))
 
         self.add(pr.RemoteVariable(
             name='TxCount',
             description='TxCount Value',
             offset=0x2C,
             mode='RO',
-            pollInterval=1,
         ))
 
+        # Data counters, refreshed together with their rates at the 1 Hz
+        # the counters were polled at before
+        self._counters = CounterBlock([self.RxCount0, self.RxCount1, self.TxCount])
+        self._rates = CounterRates(self._counters)
+        self._rates.addVariables(self, pollInterval=1)
+
+        # Read each polled register range with a single transaction
+        self._pollPlan = coalescePolls(self, extra=[(self._rates.pollInterval, self._counters.variables)])
+
         #self.hideVariables(hidden=True, variables=[self.enable])
         #self.enable.set(True)
 
+    def snapshot(self):
+        """Read the data counters in one transaction, returns a CounterSnapshot"""
+        return self._counters.read(self)
+
+    def eyeScan(self, dwell=0.01, minIdle=1, apply=True):
+        """
+        Sweep RxDelay0/1 over all taps together and return an EyeScan with
+        one lane per input. Each step writes both delays, which also clears
+        the input status counters, and reads 0x0C-0x1C in one burst. With
+        apply the center of the widest clean window of each input is set,
+        inputs without one keep their delay.
+        """
+        start  = [self._rawRead(offset=0x08), self._rawRead(offset=0x18)]
+        errors = np.zeros((2, EyeScanTaps), dtype=np.uint16)
+        idle   = np.zeros((2, EyeScanTaps), dtype=np.uint16)
+
+        for tap in range(EyeScanTaps):
+            self._rawWrite(offset=0x08, data=tap)
+            self._rawWrite(offset=0x18, data=tap)
+            time.sleep(dwell)
+            w = np.array(self._rawRead(offset=0x0C, numWords=5), dtype=np.uint32)[[0, 4]]
+            errors[:, tap] = w >> 16
+            idle[:, tap]   = w & 0xFFFF
+
+        scan = EyeScan(errors, idle, minIdle)
+        taps = [int(t) if (apply and t >= 0) else start[i] & 0x1F for i, t in enumerate(scan.taps)]
+
+        for var, offset, tap in zip([self.RxDelay0, self.RxDelay1], [0x08, 0x18], taps):
+            self._rawWrite(offset=offset, data=tap)
+            var.set(tap, write=False)
+
+        return scan
+
     def softReset(self):
         self.SoftReset()
 
@@ -8,10 +8,19 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
+import time
+import numpy as np
 import pyrogue as pr
+import rogue.interfaces.memory as rim
 
-class DtmTiming(pr.Device):
-    def __init__(self, **kwargs):
+from RceG3._AsyncDevice import AsyncDevice
+from RceG3._CounterBlock import CounterBlock, resetCommand
+from RceG3._CounterRates import CounterRates
+from RceG3._PollCoalescer import coalescePolls
+from RceG3._EyeScan      import EyeScan, EyeScanTaps
+
+class DtmTiming(AsyncDevice, pr.Device):
+    def __init__(self, pollInterval=0, **kwargs):
         super(self.__class__, self).__init__(
             description="RCE DTM Timing Registers.", **kwargs)
 
@@ -57,7 +66,7 @@ class DtmTiming(pr.Device):
             name="RxCount",
             description='Rx Data Count For Dpm',
             offset=0x500,
-            bitSize=16,
+            bitSize=32,
             bitOffset=0,
             base=pr.UInt,
             mode='RO')
@@ -94,7 +103,67 @@ class DtmTiming(pr.Device):
             name='CountReset',
             offset=0x41C,
             bitSize=1,
-            function=pr.RemoteCommand.touchOne))
+            function=resetCommand(self, pr.RemoteCommand.touchOne)))
+
+        # Data counters, refreshed together with their rates. The counters
+        # are not polled unless a pollInterval is given
+        self._counters = CounterBlock(list(self.RxCount.values()) + [self.TxCount0, self.TxCount1])
+        self._rates = CounterRates(self._counters)
+        self._rates.addVariables(self, pollInterval=pollInterval)
+
+        # Read each polled register range with a single transaction
+        self._pollPlan = coalescePolls(self, extra=[(self._rates.pollInterval, self._counters.variables)])
+
+    def snapshot(self):
+        """Read the data counters with one transaction per register window"""
+        return self._counters.read(self)
+
+    def eyeScan(self, dwell=0.01, minIdle=1, apply=True):
+        """
+        Sweep FbDelay over all taps on the eight feedback lanes at once and
+        return an EyeScan. Each step is one burst write of the delays, which
+        also clears the lane status counters, and one burst read of the
+        FbErrors/FbIdle words. With apply the center of the widest clean
+        window of each lane is set, lanes without one keep their delay.
+        """
+        start  = self._rawRead(offset=0x100, numWords=8)
+        errors = np.zeros((8, EyeScanTaps), dtype=np.uint16)
+        idle   = np.zeros((8, EyeScanTaps), dtype=np.uint16)
+
+        for tap in range(EyeScanTaps):
+            self._rawWrite(offset=0x100, data=[tap]*8)
+            time.sleep(dwell)
+            w = np.array(self._rawRead(offset=0x200, numWords=8), dtype=np.uint32)
+            errors[:, tap] = w >> 16
+            idle[:, tap]   = w & 0xFFFF
+
+        scan = EyeScan(errors, idle, minIdle)
+        taps = [int(t) if (apply and t >= 0) else start[i] & 0x1F for i, t in enumerate(scan.taps)]
+        self._rawWrite(offset=0x100, data=taps)
+
+        for i, tap in enumerate(taps):
+            self.FbDelay[i].set(tap, write=False)
+
+        return scan
+
+    def sendCommands(self, channel, opcode, count, chunk=4096):
+        """
+        Transmit opcode count times on channel 0 or 1. The TxCmd writes are
+        posted back to back and only every chunk writes are waited for, so
+        there is no bus round trip per command.
+        """
+        offset = self.offset + (0x400 if channel == 0 else 0x410)
+        data   = bytearray((opcode & 0x3FF).to_bytes(4, 'little'))
+
+        with self._memLock:
+            for start in range(0, count, chunk):
+                self._clearError()
+                for _ in range(min(chunk, count - start)):
+                    self._reqTransaction(offset, data, 4, 0, rim.Post)
+                self._waitTransaction(0)
+
+                if self._getError() != "":
+                    raise pr.MemoryError(name=self.path, address=offset, msg=self._getError())
 
     def countReset(self):
         self.CountReset()
@@ -0,0 +1,152 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+import pyrogue as pr
+
+# Derived link metrics as (name, units, description)
+HealthMetrics = (
+    ('CrcErrorRatio', '',   'Received CRC errors per received frame'),
+    ('RxPauseDuty',   '',   'Fraction of time the transmitter was paused by the link partner'),
+    ('TxPauseDuty',   '',   'Fraction of time the link partner was paused by this port'),
+    ('FifoDropRate',  'Hz', 'Received frames dropped by the receive FIFO'),
+    ('OverflowRate',  'Hz', 'Receive overflows'),
+    ('UnderRunRate',  'Hz', 'Transmit underruns'),
+    ('LinkFaultRate', 'Hz', 'Local fault, sync loss and alignment events'),
+)
+
+# Default alarm levels as (raise, clear), an alarm is raised when the metric
+# reaches raise and cleared once it falls to clear or below
+HealthThresholds = {
+    'CrcErrorRatio' : (1.0e-6, 1.0e-7),
+    'RxPauseDuty'   : (0.5, 0.25),
+    'TxPauseDuty'   : (0.5, 0.25),
+    'FifoDropRate'  : (1.0, 0.0),
+    'OverflowRate'  : (1.0, 0.0),
+    'UnderRunRate'  : (1.0, 0.0),
+    'LinkFaultRate' : (1.0, 0.0),
+}
+
+# Counters summed into LinkFaultRate
+FaultCounters = ('TxLocalFaultCount', 'RxLocalFaultCount', 'SyncStatus0Count', 'SyncStatus1Count',
+                 'SyncStatus2Count', 'SyncStatus3Count', 'AlignmentCount')
+
+# One pause quantum is 512 bit times
+PauseQuantumBits = 512
+
+class EthernetHealth(object):
+    """
+    Link quality metrics and alarms of an RceEthernet, updated from the
+    counter deltas of each CounterRates poll with a few numpy operations
+    and no extra register reads.
+
+    Pause duty cycles assume both ends use the PauseTime of this port and a
+    line rate of lineRate bits per second. Alarm levels are given per metric
+    as (raise, clear) in thresholds and override HealthThresholds.
+    """
+    def __init__(self, dev, rates, lineRate=10.0e9, thresholds=None):
+        self._dev      = dev
+        self.lineRate  = lineRate
+        self.names     = tuple(m[0] for m in HealthMetrics)
+        self.metrics   = np.zeros(len(self.names), dtype=np.float64)
+        self.alarms    = np.zeros(len(self.names), dtype=bool)
+        self._raise    = np.zeros(len(self.names), dtype=np.float64)
+        self._clear    = np.zeros(len(self.names), dtype=np.float64)
+
+        levels = dict(HealthThresholds)
+        levels.update(thresholds or {})
+        for name, (raiseLevel, clearLevel) in levels.items():
+            self.setThreshold(name, raiseLevel, clearLevel)
+
+        index = rates.block.index
+        self._frames   = index['RxEnCount']
+        self._crc      = index['RxCrcErrorCount']
+        self._rxPause  = index['RxPauseCount']
+        self._txPause  = index['TxPauseCount']
+        self._events   = np.array([index[n] for n in ('RxFifoDropCount', 'RxOverflowCount', 'TxUnderRunCount')])
+        self._faults   = np.array([index[n] for n in FaultCounters])
+
+        self._addVariables(dev)
+        rates.addListener(self.update)
+
+    def setThreshold(self, name, raiseLevel, clearLevel):
+        """Set the alarm levels of a metric, clearLevel must not exceed raiseLevel"""
+        if clearLevel > raiseLevel:
+            raise ValueError(f'{name}: clear level {clearLevel} is above raise level {raiseLevel}')
+
+        i = self.names.index(name)
+        self._raise[i] = raiseLevel
+        self._clear[i] = clearLevel
+
+    def _addVariables(self, dev):
+        self._metricVars = []
+        self._alarmVars  = []
+
+        for name, units, desc in HealthMetrics:
+            var = pr.LocalVariable(
+                name        = name,
+                description = desc,
+                mode        = 'RO',
+                value       = 0.0,
+                units       = units,
+                disp        = '{:.3g}')
+            dev.add(var)
+            self._metricVars.append(var)
+
+        for name, _, _ in HealthMetrics:
+            var = pr.LocalVariable(
+                name        = f'{name}Alarm',
+                description = f'{name} is above its alarm level',
+                mode        = 'RO',
+                value       = False)
+            dev.add(var)
+            self._alarmVars.append(var)
+
+        self._healthAlarm = pr.LocalVariable(
+            name        = 'HealthAlarm',
+            description = 'One or more link health alarms are raised',
+            mode        = 'RO',
+            value       = False)
+        dev.add(self._healthAlarm)
+
+    def update(self, rates):
+        """Recompute the metrics and alarms from the last counter deltas"""
+        if rates.dt <= 0:
+            return
+
+        d  = rates.delta.astype(np.float64)
+        dt = rates.dt
+        m  = self.metrics
+
+        pauseTime = self._dev.PauseTime.value() * PauseQuantumBits / self.lineRate
+
+        m[0] = d[self._crc] / max(d[self._frames], 1.0)
+        m[1] = min(d[self._rxPause] * pauseTime / dt, 1.0)
+        m[2] = min(d[self._txPause] * pauseTime / dt, 1.0)
+        m[3:6] = d[self._events] / dt
+        m[6] = d[self._faults].sum() / dt
+
+        # Hysteresis, a raised alarm holds until the metric reaches the clear level
+        alarms  = np.where(self.alarms, m > self._clear, m >= self._raise)
+        changed = np.flatnonzero(alarms != self.alarms)
+        self.alarms = alarms
+
+        for var, value in zip(self._metricVars, m):
+            var.set(float(value))
+
+        for i in changed:
+            self._alarmVars[i].set(bool(alarms[i]))
+
+        if len(changed) > 0:
+            self._healthAlarm.set(bool(alarms.any()))
+
+    def status(self):
+        """Current metrics and alarm states by metric name"""
+        return {n: {'value': float(v), 'alarm': bool(a)} for n, v, a in zip(self.names, self.metrics, self.alarms)}
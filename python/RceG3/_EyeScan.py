@@ -0,0 +1,54 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import concurrent.futures
+import numpy as np
+
+# Number of input delay taps of the timing link receivers
+EyeScanTaps = 32
+
+class EyeScan(object):
+    """
+    Result of a delay tap scan of one or more timing link inputs.
+
+    errors and idle are (lanes x taps) matrices of the receiver error and
+    idle counters after each dwell. A tap is clean when it has no errors
+    and at least minIdle idle cycles. The chosen tap of a lane is the
+    center of its widest clean window, or -1 if it has no clean tap.
+    """
+    def __init__(self, errors, idle, minIdle=1):
+        self.errors = errors
+        self.idle   = idle
+        self.clean  = (errors == 0) & (idle >= minIdle)
+        self.taps   = np.full(errors.shape[0], -1, dtype=np.int32)
+        self.widths = np.zeros(errors.shape[0], dtype=np.int32)
+
+        for lane, row in enumerate(self.clean):
+            # Run boundaries of clean taps
+            edges  = np.diff(np.concatenate(([0], row.astype(np.int8), [0])))
+            starts = np.flatnonzero(edges == 1)
+            stops  = np.flatnonzero(edges == -1)
+
+            if len(starts) > 0:
+                best = np.argmax(stops - starts)
+                self.widths[lane] = stops[best] - starts[best]
+                self.taps[lane]   = (starts[best] + stops[best] - 1) // 2
+
+    def __repr__(self):
+        return f'EyeScan(taps={self.taps.tolist()}, widths={self.widths.tolist()})'
+
+def eyeScanAll(devices, maxWorkers=16, **kwargs):
+    """
+    Run eyeScan() on many DtmTiming/DpmTiming devices concurrently, returns
+    a dict of EyeScan keyed by device path.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+        futures = {dev.path: pool.submit(dev.eyeScan, **kwargs) for dev in devices}
+        return {path: fut.result() for path, fut in futures.items()}
@@ -0,0 +1,167 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import threading
+import time
+import numpy as np
+import pyrogue as pr
+import rogue.interfaces.memory as rim
+
+# Target states
+Unknown     = 0
+Alive       = 1
+NoProgress  = 2  # HeartBeat read but not incrementing
+Restarted   = 3  # HeartBeat went backwards, firmware reloaded or reset
+Stalled     = 4  # HeartBeat reads failing
+
+StatusNames = ('Unknown', 'Alive', 'NoProgress', 'Restarted', 'Stalled')
+
+WatchdogState = np.dtype([
+    ('registered', '<f8'),  # Time of the first poll of the target
+    ('value',      '<u4'),  # Last HeartBeat value
+    ('lastRead',   '<f8'),  # Time of the last successful read
+    ('lastChange', '<f8'),  # Time the value last advanced
+    ('lastRestart','<f8'),  # Time of the last restart
+    ('rate',       '<f4'),  # Estimated increments per second
+    ('status',     '<u1'),
+    ('restarts',   '<u4'),
+    ('errors',     '<u4'),
+])
+
+class HeartBeatDevice(pr.Device):
+    """Only the HeartBeat register of an RCE, for roots which supervise many RCEs"""
+    def __init__(self, intOffset=0x80000000, **kwargs):
+        super().__init__(**kwargs)
+
+        self.add(pr.RemoteVariable(
+            name        = 'HeartBeat',
+            description = 'A constantly incrementing value',
+            offset      = intOffset+0x38,
+            mode        = 'RO',
+        ))
+
+class HeartBeatWatchdog(object):
+    """
+    Liveness supervisor reading only the HeartBeat word of each target, a
+    device with a HeartBeat variable such as RceVersion or HeartBeatDevice.
+    Reads are issued in batches of batchSize, all transactions of a batch
+    are in flight together. State is kept in one WatchdogState array.
+
+    A target is NoProgress when its HeartBeat has not advanced for window
+    seconds, Stalled when it has not been read for window seconds, or not
+    at all within window seconds of its first poll, and Restarted for
+    window seconds after its HeartBeat went backwards by more than a
+    counter wrap explains. onChange(target, old, new) is called on
+    each status change.
+    """
+    def __init__(self, targets, period=0.1, window=1.0, batchSize=256, onChange=None):
+        self.targets   = list(targets)
+        self.period    = period
+        self.window    = window
+        self.batchSize = batchSize
+        self.onChange  = onChange
+        self.state     = np.zeros(len(self.targets), dtype=WatchdogState)
+        self._vars     = [t.HeartBeat for t in self.targets]
+        self._run      = threading.Event()
+        self._thread   = None
+
+    def _read(self):
+        """HeartBeat values and a read ok mask for all targets"""
+        values = np.zeros(len(self._vars), dtype=np.uint32)
+        ok     = np.zeros(len(self._vars), dtype=bool)
+
+        for start in range(0, len(self._vars), self.batchSize):
+            batch = range(start, min(start + self.batchSize, len(self._vars)))
+            started = []
+            for i in batch:
+                try:
+                    pr.startTransaction(self._vars[i]._block, type=rim.Read)
+                    started.append(i)
+                except Exception:
+                    pass
+
+            for i in started:
+                try:
+                    pr.checkTransaction(self._vars[i]._block)
+                    values[i] = self._vars[i].value()
+                    ok[i] = True
+                except Exception:
+                    pass
+
+        return values, ok
+
+    def poll(self):
+        """Read all targets once and update the state, returns the changed indexes"""
+        values, ok = self._read()
+        now = time.time()
+        st  = self.state
+        old = st['status'].copy()
+
+        st['registered'] = np.where(st['registered'] == 0, now, st['registered'])
+
+        first = ok & (st['lastRead'] == 0)
+        delta = (values.astype(np.int64) - st['value']) & 0xFFFFFFFF
+        dt    = np.maximum(now - st['lastRead'], 1e-6)
+
+        # A backwards step is a wrap if it matches the recent increment rate
+        back    = ok & ~first & (values < st['value'])
+        wrap    = back & (st['rate'] > 0) & (delta <= 4 * st['rate'] * dt)
+        restart = back & ~wrap
+        advance = ok & ~first & (values != st['value']) & ~restart
+
+        rate = np.where(advance, delta / dt, st['rate'])
+        st['rate'] = np.where(st['rate'] > 0, 0.75 * st['rate'] + 0.25 * rate, rate)
+
+        st['lastChange']  = np.where(first | advance | restart, now, st['lastChange'])
+        st['lastRestart'] = np.where(restart, now, st['lastRestart'])
+        st['restarts']   += restart
+        st['errors']     += ~ok
+        st['value']       = np.where(ok, values, st['value'])
+        st['lastRead']    = np.where(ok, now, st['lastRead'])
+
+        status = np.full(len(st), Alive, dtype=np.uint8)
+        status[(now - st['lastChange']) > self.window] = NoProgress
+        status[(st['lastRestart'] > 0) & ((now - st['lastRestart']) <= self.window)] = Restarted
+        status[(now - st['lastRead']) > self.window] = Stalled
+        status[(st['lastRead'] == 0) & ((now - st['registered']) <= self.window)] = Unknown
+        st['status'] = status
+
+        changed = np.flatnonzero(status != old)
+        if self.onChange is not None:
+            for i in changed:
+                self.onChange(self.targets[i], StatusNames[old[i]], StatusNames[status[i]])
+        return changed
+
+    def status(self):
+        """Status name by target path"""
+        return {t.path: StatusNames[s] for t, s in zip(self.targets, self.state['status'])}
+
+    def counts(self):
+        """Number of targets in each status"""
+        n = np.bincount(self.state['status'], minlength=len(StatusNames))
+        return dict(zip(StatusNames, n.tolist()))
+
+    def start(self):
+        """Poll every period seconds in a background thread"""
+        def _loop():
+            while not self._run.is_set():
+                t0 = time.monotonic()
+                self.poll()
+                self._run.wait(max(0.0, self.period - (time.monotonic() - t0)))
+
+        self._run.clear()
+        self._thread = threading.Thread(target=_loop, name='HeartBeatWatchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._run.set()
+            self._thread.join()
+            self._thread = None
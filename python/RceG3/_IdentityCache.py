@@ -0,0 +1,56 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import os
+import json
+import threading
+
+class IdentityCache(object):
+    """
+    On disk cache of the static RceVersion registers. Entries are keyed by
+    DeviceDna, FpgaVersion and GitHash so reprogramming the FPGA or moving
+    the file to another board never returns a stale entry.
+    """
+    _locks = {}
+
+    def __init__(self, path):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self._lock = IdentityCache._locks.setdefault(self.path, threading.Lock())
+        self._entries = None
+
+    @staticmethod
+    def key(deviceDna, fpgaVersion, gitHash):
+        return f'{deviceDna:016x}-{fpgaVersion:08x}-{gitHash:040x}'
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key):
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key, values):
+        with self._lock:
+            # Merge with the latest file contents
+            self._entries = None
+            entries = self._load()
+            entries[key] = values
+
+            # Atomic replace, concurrent readers never see a partial file
+            tmp = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(entries, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
@@ -0,0 +1,227 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import concurrent.futures
+import http.server
+import re
+import threading
+import time
+
+from RceG3._CounterRates import CounterRates
+from RceG3._RceFleet     import findDevices
+from RceG3._RceBsi       import RceBsi
+from RceG3._RceVersion   import RceVersion
+from RceG3._RceEthernet  import RceEthernet
+from RceG3._DpmTiming    import DpmTiming
+from RceG3._DtmTiming    import DtmTiming
+from RceG3._RceG3Dma     import RceG3DmaChan, RceG3DmaPpiChan
+
+ContentType = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Devices whose counter blocks are exported
+CounterDevices = (RceEthernet, DpmTiming, DtmTiming, RceG3DmaChan, RceG3DmaPpiChan)
+
+def metricName(*parts):
+    """rceg3_ prefixed snake case metric name, RxCrcErrorCount -> rx_crc_error_count"""
+    return '_'.join(['rceg3'] + [re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', p).lower() for p in parts])
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+class SnapshotCache(object):
+    """
+    Result of func reused for maxAge seconds. Callers arriving while a
+    refresh is in flight wait for it instead of starting another, so
+    concurrent scrapes share one hardware read.
+    """
+    def __init__(self, func, maxAge):
+        self._func    = func
+        self.maxAge   = maxAge
+        self._cond    = threading.Condition()
+        self._busy    = False
+        self._value   = None
+        self._time    = 0.0
+        self._stamp   = 0.0
+        self._error   = None
+
+    def get(self):
+        """Returns (value, timestamp), raises the error of a failed refresh"""
+        with self._cond:
+            while True:
+                if self._time > 0 and time.monotonic() - self._time <= self.maxAge:
+                    if self._error is not None:
+                        raise self._error
+                    return self._value, self._stamp
+                if not self._busy:
+                    break
+                self._cond.wait()
+            self._busy = True
+
+        value = error = None
+        try:
+            value = self._func()
+        except Exception as e:
+            error = e
+
+        stamp = time.time()
+        with self._cond:
+            self._value = value
+            self._error = error
+            self._time  = time.monotonic()
+            self._stamp = stamp
+            self._busy  = False
+            self._cond.notify_all()
+
+        if error is not None:
+            raise error
+        return value, stamp
+
+class _RootMetrics(object):
+    """Devices, static labels and counter accumulators of one root"""
+    def __init__(self, root, maxAge):
+        self.root     = root
+        self.counters = [(d, CounterRates(d._counters)) for d in findDevices(root, CounterDevices)]
+        self.versions = findDevices(root, RceVersion)
+        self.bsi      = findDevices(root, RceBsi)
+        self.labels   = None
+        self.cache    = SnapshotCache(self.read, maxAge)
+
+    def _readLabels(self):
+        # Identity registers only change when the FPGA is reprogrammed, the
+        # BSI location is read once at start
+        labels = {'root': self.root.name}
+        for dev in (self.bsi + self.versions)[:1]:
+            labels.update(slot=dev.AtcaSlot.value(), bay=dev.CobBay.value(), element=dev.CobElement.value())
+        for dev in self.versions[:1]:
+            info = dev.buildInfo()
+            labels.update(image=info['ImageName'], git=info['GitHashShort'])
+        return labels
+
+    def read(self):
+        """One snapshot of every counter device plus the heartbeats"""
+        if self.labels is None:
+            self.labels = self._readLabels()
+
+        ret = []
+        for dev, rates in self.counters:
+            rates.update(dev.snapshot())
+            ret.append((dev, rates.total.copy()))
+
+        beats = [(dev, dev._rawRead(offset=dev._intOffset + 0x38)) for dev in self.versions]
+        return ret, beats
+
+class MetricsExporter(object):
+    """
+    Serves the counters of the CounterDevices, e.g. RceEthernet, and the
+    RceVersion HeartBeat of roots in the text exposition format on
+    http://address:port/metrics.
+
+    Counters are exported as 64-bit totals accumulated across hardware
+    wraps since the exporter started. Each root is read at most once per
+    maxAge seconds however many scrapers there are, and roots are read in
+    parallel. Labels come from the RceBsi or RceVersion location and the
+    RceVersion ImageName and GitHashShort, read once per root.
+    """
+    def __init__(self, roots, port=9100, address='127.0.0.1', maxAge=1.0, maxWorkers=16):
+        self._roots    = [_RootMetrics(r, maxAge) for r in roots]
+        self._pool     = concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='MetricsExporter')
+        self._address  = (address, port)
+        self._server   = None
+        self._thread   = None
+
+    def render(self):
+        """Text exposition of all roots"""
+        metrics = {}  # name -> (type, help, lines)
+
+        def add(name, typ, desc, labels, value):
+            metrics.setdefault(name, (typ, desc, []))[2].append(f'{name}{_labels(labels)} {value}')
+
+        results = self._pool.map(self._collect, self._roots)
+        for rm, (data, stamp, error) in zip(self._roots, results):
+            base = dict(rm.labels or {'root': rm.root.name})
+            add('rceg3_up', 'gauge', 'Last read of the root succeeded', base, 0 if error else 1)
+            if error:
+                continue
+
+            add('rceg3_snapshot_age_seconds', 'gauge', 'Age of the served snapshot', base, f'{time.time() - stamp:.3f}')
+
+            counters, beats = data
+            for dev, totals in counters:
+                for name, value in zip(dev._counters.names, totals):
+                    labels = dict(base, device=dev.name)
+                    if name.endswith(']'):
+                        name, idx = name[:-1].split('[')
+                        labels['index'] = idx
+                    add(metricName(type(dev).__name__, name) + '_total', 'counter', f'{type(dev).__name__} {name}', labels, int(value))
+
+            for dev, beat in beats:
+                add('rceg3_heartbeat', 'gauge', 'RceVersion HeartBeat register', dict(base, device=dev.name), int(beat))
+
+        out = []
+        for name, (typ, desc, lines) in metrics.items():
+            out.append(f'# HELP {name} {desc}')
+            out.append(f'# TYPE {name} {typ}')
+            out.extend(lines)
+        return '\n'.join(out) + '\n'
+
+    @staticmethod
+    def _collect(rm):
+        try:
+            value, stamp = rm.cache.get()
+            return value, stamp, None
+        except Exception as e:
+            return None, None, e
+
+    def start(self):
+        """Serve in a background thread"""
+        exporter = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', ContentType)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(self._address, Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='MetricsExporter', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+        self._pool.shutdown(wait=False)
+
+    @property
+    def port(self):
+        """Bound port, useful with port=0"""
+        return self._server.server_address[1] if self._server is not None else self._address[1]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
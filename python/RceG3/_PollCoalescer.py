@@ -0,0 +1,94 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import collections
+import pyrogue as pr
+import rogue.interfaces.memory as rim
+
+def byteRange(var):
+    """Word aligned [start, stop) byte range covered by a remote variable"""
+    bits = max(o + s for o, s in zip(var.bitOffset, var.bitSize))
+    return (var.offset, var.offset + ((bits + 31) // 32) * 4)
+
+class PollPlan(object):
+    """
+    Coalesced poll groups of a device. Each group is (interval, start, stop,
+    names). naive and merged are the read transactions per group without
+    and with coalescing.
+    """
+    def __init__(self):
+        self.groups = []
+        self.naive  = 0
+        self.merged = 0
+        self.saved  = 0.0
+
+    def __repr__(self):
+        return f'PollPlan(groups={len(self.groups)}, naive={self.naive}, merged={self.merged}, saved={self.saved:g}/s)'
+
+def coalescePolls(dev, extra=()):
+    """
+    Merge the polled remote variables of dev which share an interval and a
+    contiguous address range into custom blocks, so each range is read with
+    one transaction per poll. extra is a list of (interval, variables) that
+    are refreshed together by another polled variable. A range is never
+    extended over a variable outside its group, so writes to neighbouring
+    registers are unaffected. Must be called before the root is started.
+    """
+    remote = [v for v in dev.variables.values()
+              if isinstance(v, pr.RemoteVariable) and v.offset is not None]
+
+    groups = collections.defaultdict(list)
+    for v in remote:
+        if not isinstance(v, pr.BaseCommand) and v.pollInterval > 0:
+            groups[v.pollInterval].append(v)
+
+    for interval, variables in extra:
+        if interval > 0:
+            groups[interval].extend(v for v in variables if v not in groups[interval])
+
+    plan = PollPlan()
+
+    for interval, variables in groups.items():
+        members = set(id(v) for v in variables)
+        others  = [byteRange(v) for v in remote if id(v) not in members]
+
+        ranges = []
+        for v in sorted(variables, key=lambda v: v.offset):
+            start, stop = byteRange(v)
+
+            if ranges and start < ranges[-1][1]:
+                # Overlap, rogue already shares the block
+                ranges[-1][1] = max(ranges[-1][1], stop)
+                ranges[-1][2].append(v.name)
+            elif ranges and start == ranges[-1][1] and not any(o[0] < stop and o[1] > ranges[-1][0] for o in others):
+                ranges[-1][1] = stop
+                ranges[-1][2].append(v.name)
+                ranges[-1][3] += 1
+            else:
+                ranges.append([start, stop, [v.name], 1])
+
+        for start, stop, names, naive in ranges:
+            if naive > 1:
+                dev.addCustomBlock(rim.Block(start, stop - start))
+
+            plan.groups.append((interval, start, stop, names))
+            plan.naive  += naive
+            plan.merged += 1
+            plan.saved  += (naive - 1) / interval
+
+    dev.add(pr.LocalVariable(
+        name        = 'PollSaved',
+        description = 'Read transactions per second saved by poll coalescing',
+        mode        = 'RO',
+        value       = plan.saved,
+        units       = '1/s',
+        hidden      = True))
+
+    return plan
@@ -0,0 +1,304 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import threading
+import time
+import numpy as np
+import pyrogue as pr
+
+from RceG3._RceFleet import findDevices
+
+class LatencyHistogram(object):
+    """
+    Log-linear latency histogram in nanoseconds with fixed memory. Each
+    power of two is split in 16 buckets, so a bucket is within 6.25% of the
+    recorded value, up to 2**MaxBits ns.
+    """
+    SubBits = 4
+    MaxBits = 40
+
+    def __init__(self):
+        self.counts = np.zeros((self.MaxBits - self.SubBits + 1) << self.SubBits, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0
+        self.min   = None
+        self.max   = 0
+
+    @classmethod
+    def index(cls, ns):
+        ns = min(ns, (1 << cls.MaxBits) - 1)
+        m  = max(ns.bit_length() - cls.SubBits - 1, 0)
+        return (m << cls.SubBits) + (ns >> m)
+
+    @classmethod
+    def lowest(cls, idx):
+        """Lowest value of bucket idx"""
+        m = max((idx >> cls.SubBits) - 1, 0)
+        return (idx - (m << cls.SubBits)) << m
+
+    def record(self, ns):
+        self.counts[self.index(ns)] += 1
+        self.count += 1
+        self.total += ns
+        self.max = max(self.max, ns)
+        self.min = ns if self.min is None else min(self.min, ns)
+
+    def percentile(self, q):
+        """Latency at percentile q (0-100), the middle of its bucket"""
+        if self.count == 0:
+            return 0
+        idx = int(np.searchsorted(np.cumsum(self.counts), self.count * q / 100.0, side='left'))
+        return (self.lowest(idx) + self.lowest(idx + 1)) // 2
+
+class _TransactionHook(object):
+    """
+    Block transaction hook shared by all enabled profilers. pyrogue starts
+    and checks block transactions through module functions, so those are
+    replaced once while any profiler is enabled and restored when the last
+    one is disabled. Each block is dispatched to the profilers which own
+    it, the blocks of other roots pass through with a dict lookup.
+    """
+    _lock   = threading.Lock()
+    _orig   = None
+    _owners = {}  # Block id -> tuple of Profiler
+    _users  = set()
+
+    @classmethod
+    def install(cls, profiler, blocks):
+        with cls._lock:
+            owners = dict(cls._owners)
+            for b in blocks:
+                owners[b] = owners.get(b, ()) + (profiler,)
+            cls._owners = owners
+
+            if not cls._users:
+                cls._orig = (pr.startTransaction, pr.checkTransaction)
+                pr.startTransaction = cls.startTransaction
+                pr.checkTransaction = cls.checkTransaction
+            cls._users.add(profiler)
+
+    @classmethod
+    def uninstall(cls, profiler):
+        with cls._lock:
+            owners = {}
+            for b, profs in cls._owners.items():
+                profs = tuple(p for p in profs if p is not profiler)
+                if profs:
+                    owners[b] = profs
+            cls._owners = owners
+
+            cls._users.discard(profiler)
+            if not cls._users:
+                # Only restore if nobody patched over the hook meanwhile,
+                # otherwise it stays in place and passes everything through
+                if pr.startTransaction == cls.startTransaction:
+                    pr.startTransaction = cls._orig[0]
+                if pr.checkTransaction == cls.checkTransaction:
+                    pr.checkTransaction = cls._orig[1]
+
+    @classmethod
+    def startTransaction(cls, block, *args, **kwargs):
+        now = time.perf_counter_ns()
+        for prof in cls._owners.get(id(block), ()):
+            prof._pending[id(block)] = now
+        return cls._orig[0](block, *args, **kwargs)
+
+    @classmethod
+    def checkTransaction(cls, block, *args, **kwargs):
+        try:
+            return cls._orig[1](block, *args, **kwargs)
+        finally:
+            now = time.perf_counter_ns()
+            for prof in cls._owners.get(id(block), ()):
+                start = prof._pending.pop(id(block), None)
+                if start is not None:
+                    prof._record(prof._blocks[id(block)], now - start)
+
+class Profiler(object):
+    """
+    Opt-in access profiler for the RceG3 devices. enable() wraps the get and
+    set methods of the variables and the raw accesses of the devices and
+    times the block transactions of their register blocks only, disable()
+    removes the wrappers so there is no cost while the profiler is off.
+    Several profilers may be enabled at once, on different roots or
+    devices, and disabled in any order.
+
+    Entries are keyed by (device, name, kind), kind is one of:
+        read      get() with a register read
+        write     set() with a register write
+        link      LinkVariable get() from cached values, the compute time
+        linkRead  LinkVariable get() including the dependency reads
+        raw       _rawRead/_rawWrite of the device
+        block     block transaction from polling, ReadAll or a counter refresh
+    """
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._hist    = {}
+        self._wrapped = []  # (object, attribute, wrapper, previous) to restore
+        self._blocks  = {}  # Block id -> key
+        self._pending = {}  # Block id -> start time
+        self._enabled = False
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    def _record(self, key, ns):
+        with self._lock:
+            hist = self._hist.get(key)
+            if hist is None:
+                hist = self._hist[key] = LatencyHistogram()
+            hist.record(ns)
+
+    def _wrap(self, obj, attr, func):
+        self._wrapped.append((obj, attr, func, obj.__dict__.get(attr)))
+        setattr(obj, attr, func)
+
+    def _wrapVariable(self, dev, var):
+        link = isinstance(var, pr.LinkVariable)
+        origGet = var.get
+        origSet = var.set
+
+        def profGet(*args, **kwargs):
+            if not self._enabled:
+                return origGet(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return origGet(*args, **kwargs)
+            finally:
+                read = kwargs.get('read', args[0] if args else True)
+                if link:
+                    self._record((dev.path, var.name, 'linkRead' if read else 'link'), time.perf_counter_ns() - start)
+                elif read:
+                    self._record((dev.path, var.name, 'read'), time.perf_counter_ns() - start)
+
+        def profSet(value, *args, **kwargs):
+            if not self._enabled:
+                return origSet(value, *args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return origSet(value, *args, **kwargs)
+            finally:
+                if kwargs.get('write', True) and not link:
+                    self._record((dev.path, var.name, 'write'), time.perf_counter_ns() - start)
+
+        self._wrap(var, 'get', profGet)
+        self._wrap(var, 'set', profSet)
+
+    def _wrapRaw(self, dev, attr):
+        func = getattr(dev, attr)
+
+        def profRaw(*args, **kwargs):
+            if not self._enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record((dev.path, attr, 'raw'), time.perf_counter_ns() - start)
+
+        self._wrap(dev, attr, profRaw)
+
+    def enable(self, *nodes):
+        """Profile the devices in nodes, a root or devices, and their sub-devices"""
+        if self.enabled:
+            self.disable()
+
+        devices = {}
+        for node in nodes:
+            for dev in [node] + findDevices(node, pr.Device):
+                devices[id(dev)] = dev
+
+        for dev in devices.values():
+            for var in dev.variables.values():
+                if isinstance(var, pr.BaseCommand):
+                    continue
+                self._wrapVariable(dev, var)
+
+                block = getattr(var, '_block', None)
+                if block is not None and id(block) not in self._blocks:
+                    self._blocks[id(block)] = (dev.path, f'Block[{var.name}]', 'block')
+
+            if not isinstance(dev, pr.Root):
+                self._wrapRaw(dev, '_rawRead')
+                self._wrapRaw(dev, '_rawWrite')
+
+        _TransactionHook.install(self, self._blocks)
+        self._enabled = True
+
+    def disable(self):
+        """Remove all wrappers, the collected statistics are kept"""
+        if self._enabled:
+            _TransactionHook.uninstall(self)
+            self._enabled = False
+
+        # A wrapper another profiler wrapped again stays in its chain and
+        # passes through now that this profiler is disabled
+        for obj, attr, func, prev in reversed(self._wrapped):
+            if obj.__dict__.get(attr) is not func:
+                continue
+            if prev is None:
+                delattr(obj, attr)
+            else:
+                setattr(obj, attr, prev)
+
+        self._wrapped = []
+        self._blocks  = {}
+        self._pending = {}
+
+    def reset(self):
+        """Clear all statistics, profiling continues if enabled"""
+        with self._lock:
+            for hist in self._hist.values():
+                hist.reset()
+
+    def report(self, top=20, kinds=None):
+        """
+        Entries with the largest total time, as dicts sorted by total time.
+        kinds restricts the report to some entry kinds.
+        """
+        with self._lock:
+            entries = [(k, h) for k, h in self._hist.items()
+                       if h.count > 0 and (kinds is None or k[2] in kinds)]
+
+        entries.sort(key=lambda e: e[1].total, reverse=True)
+        return [{
+            'device'  : dev,
+            'name'    : name,
+            'kind'    : kind,
+            'count'   : h.count,
+            'total_s' : h.total * 1e-9,
+            'mean_s'  : h.total / h.count * 1e-9,
+            'p50_s'   : h.percentile(50) * 1e-9,
+            'p99_s'   : h.percentile(99) * 1e-9,
+            'max_s'   : h.max * 1e-9,
+        } for (dev, name, kind), h in entries[:top]]
+
+    def deviceReport(self):
+        """Transaction count and total time per device, link compute time excluded"""
+        ret = {}
+        with self._lock:
+            for (dev, _, kind), h in self._hist.items():
+                if kind not in ('link', 'linkRead'):
+                    ent = ret.setdefault(dev, {'count': 0, 'total_s': 0.0})
+                    ent['count']   += h.count
+                    ent['total_s'] += h.total * 1e-9
+        return dict(sorted(ret.items(), key=lambda e: e[1]['total_s'], reverse=True))
+
+    def printReport(self, top=20):
+        print(f"{'Device':40} {'Name':28} {'Kind':8} {'Count':>8} {'Total ms':>10} "
+              f"{'Mean us':>9} {'p50 us':>9} {'p99 us':>9} {'Max us':>9}")
+        for e in self.report(top):
+            print(f"{e['device']:40} {e['name']:28} {e['kind']:8} {e['count']:8d} {e['total_s']*1e3:10.3f} "
+                  f"{e['mean_s']*1e6:9.1f} {e['p50_s']*1e6:9.1f} {e['p99_s']*1e6:9.1f} {e['max_s']*1e6:9.1f}")
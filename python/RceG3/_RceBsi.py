@@ -9,37 +9,86 @@
 #-----------------------------------------------------------------------------
 
 import pyrogue
+import rogue.interfaces.memory as rim
 
-class RceBsi(pyrogue.Device):
+from RceG3._AsyncDevice import AsyncDevice
+
+# BSI I2C slave registers. They are fixed per slot, so they are read in
+# one block at start and skipped by bulk reads.
+BsiFields = ('SerialNumber', 'AtcaSlot', 'CobBay', 'CobElement')
+
+def addBsiRegisters(dev, offset):
+    """Add the BSI registers at offset, served by a single 0x140-0x14B block"""
+    dev.addCustomBlock(rim.Block(offset + 0x140, 12))
+
+    dev.add(pyrogue.RemoteVariable(
+        name        = 'SerialNumber',
+        description = 'Serial Number',
+        offset      = offset+0x140,
+        bitSize     = 64,
+        mode        = 'RO',
+        bulkOpEn    = False,
+    ))
+
+    dev.add(pyrogue.RemoteVariable(
+        name        = 'AtcaSlot',
+        description = 'ATCA Slot',
+        offset      = offset+0x148,
+        bitSize     = 8,
+        bitOffset   = 16,
+        mode        = 'RO',
+        bulkOpEn    = False,
+    ))
+
+    dev.add(pyrogue.RemoteVariable(
+        name        = 'CobBay',
+        description = 'COB Bay',
+        offset      = offset+0x148,
+        bitSize     = 8,
+        bitOffset   = 8,
+        mode        = 'RO',
+        bulkOpEn    = False,
+    ))
+
+    dev.add(pyrogue.RemoteVariable(
+        name        = 'CobElement',
+        description = 'COB Element',
+        offset      = offset+0x148,
+        bitSize     = 8,
+        mode        = 'RO',
+        bulkOpEn    = False,
+    ))
+
+def refreshBsi(dev):
+    """Read the BSI block of dev in one transaction, returns the fields by name"""
+    block = dev.SerialNumber._block
+    pyrogue.startTransaction(block, type=rim.Read)
+    pyrogue.checkTransaction(block)
+    return {name: getattr(dev, name).value() for name in BsiFields}
+
+class RceBsi(AsyncDevice, pyrogue.Device):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self.add(pyrogue.RemoteVariable(
-            name='SerialNumber',
-            description='Serial Number',
-            offset=0x140,
-            bitSize=64,
-            mode='RO'))
-
-        self.add(pyrogue.RemoteVariable(
-            name='AtcaSlot',
-            description='ATCA Slot',
-            offset=0x148,
-            bitSize=8,
-            bitOffset=16,
-            mode='RO'))
-
-        self.add(pyrogue.RemoteVariable(
-            name='CobBay',
-            description='COB Bay',
-            offset=0x148,
-            bitSize=8,
-            bitOffset=8,
-            mode='RO'))
-
-        self.add(pyrogue.RemoteVariable(
-            name='CobElement',
-            description='COB Element',
-            offset=0x148,
-            bitSize=8,
-            mode='RO'))
+        addBsiRegisters(self, 0)
+
+        self.add(pyrogue.LocalCommand(
+            name='RefreshBsi',
+            description='Read the BSI registers again, e.g. after a hot-swap',
+            function=lambda: self.refresh()))
+
+    def _start(self):
+        super()._start()
+
+        try:
+            self.refresh()
+        except Exception as e:
+            self._log.warning(f'BSI read failed: {e}')
+
+    def refresh(self):
+        """Read SerialNumber and the location in one transaction and cache them"""
+        return refreshBsi(self)
+
+    def identity(self):
+        """Cached BSI fields by name, no bus access"""
+        return {name: getattr(self, name).value() for name in BsiFields}
@@ -0,0 +1,261 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import heapq
+import random
+import threading
+import time
+
+import pyrogue as pr
+import rogue.interfaces.memory as rim
+
+from RceG3._DpmTiming   import DpmTiming
+from RceG3._DtmTiming   import DtmTiming
+from RceG3._RceVersion  import RceVersion
+from RceG3._RceBsi      import RceBsi
+from RceG3._RceEthernet import RceEthernet
+
+# Address maps of the two processor families
+RceLayouts = {
+    'zynq'      : {'intOffset': 0x80000000, 'bsiOffset': 0x84000000},
+    'zynquplus' : {'intOffset': 0xB0000000, 'bsiOffset': 0xB0010000},
+}
+
+RceEthernetOffset = 0xB0000000
+
+class _Counter(object):
+    """Free running counter derived from the wall clock, wraps or saturates at bitSize"""
+    def __init__(self, rate, bitSize=32, saturate=False):
+        self.rate = rate
+        self.mask = (1 << bitSize) - 1
+        self.saturate = saturate
+        self.reset()
+
+    def reset(self):
+        self.t0 = time.monotonic()
+
+    def __call__(self):
+        count = int((time.monotonic() - self.t0) * self.rate)
+        return min(count, self.mask) if self.saturate else count & self.mask
+
+class RceEmulator(rim.Slave):
+    """
+    Memory backed stand-in for the register spaces of one RCE, used with
+    the RceG3 device classes when no hardware is available.
+
+    Emulates the RceVersion internal and BSI registers for the zynq or
+    zynquplus layout, the zynq RceEthernet block and either a DpmTiming or
+    DtmTiming block at timingOffset. Counters advance with the wall clock
+    and wrap at their register width, the RceEthernet error counters
+    saturate instead. HeartBeat increments and the delay taps of the timing
+    inputs have a clean eye between the two taps of eye.
+
+    Every transaction is completed latency seconds after it is issued by a
+    completion thread, so transactions from many masters overlap in flight.
+    """
+    Arguments = ('layout', 'timing', 'timingOffset', 'latency', 'counterRate',
+                 'heartBeatRate', 'location', 'eye', 'imageName', 'seed')
+
+    def __init__(self, *,
+                 layout       = 'zynq',
+                 timing       = 'dpm',
+                 timingOffset = 0xA0000000,
+                 latency      = 0.0,
+                 counterRate  = 1.0e5,
+                 heartBeatRate= 1.0e6,
+                 location     = (2, 1, 0),
+                 eye          = (8, 20),
+                 imageName    = 'DpmEmulator',
+                 seed         = None):
+
+        rim.Slave.__init__(self, 4, 0x1000)
+        rng = random.Random(seed)
+
+        self._lock    = threading.Lock()
+        self._latency = latency
+        self._data    = {}  # Static and RW register words by address
+        self._readFn  = {}  # Dynamic register words by address
+        self._writeFn = {}  # Write side effects by address
+        self._eye     = eye
+
+        self.layout   = RceLayouts[layout]
+        self.timing   = timing
+        self.timingOffset = timingOffset
+        self.ethernet = (layout == 'zynq')
+
+        self._buildVersion(rng, heartBeatRate, location, imageName)
+        if self.ethernet:
+            self._buildEthernet(rng, counterRate)
+        if timing == 'dpm':
+            self._buildDpmTiming(counterRate)
+        elif timing == 'dtm':
+            self._buildDtmTiming(counterRate)
+
+        # Deferred completion
+        self._queue = []
+        self._cond  = threading.Condition()
+        self._seq   = 0
+        if latency > 0:
+            self._thread = threading.Thread(target=self._completeWorker, name='RceEmulator', daemon=True)
+            self._thread.start()
+
+    def _setWords(self, address, value, count):
+        for i in range(count):
+            self._data[address + 4*i] = (value >> (32*i)) & 0xFFFFFFFF
+
+    def _buildVersion(self, rng, heartBeatRate, location, imageName):
+        base = self.layout['intOffset']
+        bsi  = self.layout['bsiOffset']
+
+        self._setWords(base+0x00, 0xC0DE0100, 1)                 # FpgaVersion
+        self._setWords(base+0x04, 0, 1)                          # ScratchPad
+        self._setWords(base+0x08, 0x00000014, 1)                 # RceVersion
+        self._setWords(base+0x20, rng.getrandbits(128), 4)       # DeviceDna
+        self._setWords(base+0x30, rng.getrandbits(32), 1)        # EFuseValue
+        self._setWords(base+0x34, 0, 1)                          # EthMode
+        self._setWords(base+0x40, rng.getrandbits(160), 5)       # GitHash
+        self._readFn[base+0x38] = _Counter(heartBeatRate)        # HeartBeat
+
+        stamp = (f'{imageName}: Vivado v2018.3, rdsrv300 (Ubuntu 18.04.4 LTS), '
+                 f'Built {time.strftime("%a %b %d %H:%M:%S PST %Y")} by emulator').encode()
+        self._setWords(base+0x1000, int.from_bytes(stamp.ljust(256, b'\0'), 'little'), 64)
+
+        slot, bay, element = location
+        self._setWords(bsi+0x140, rng.getrandbits(64), 2)        # SerialNumber
+        self._setWords(bsi+0x148, (slot << 16) | (bay << 8) | element, 1)
+
+    def _buildEthernet(self, rng, counterRate):
+        base = RceEthernetOffset
+
+        self._setWords(base+0x008, 0x1, 1)
+        self._setWords(base+0x010, 0xFFFF, 1)
+        self._setWords(base+0x014, rng.getrandbits(48), 2)
+        self._setWords(base+0x01C, 0x0100A8C0, 1)
+        self._setWords(base+0x020, 0xFF, 1)
+        self._setWords(base+0x038, 0x001F0000, 1)
+        self._setWords(base+0x03C, 0x000F, 1)
+
+        # RxEnCount and TxEnCount run at the full rate and roll over, the
+        # error counters count rarely and saturate
+        counters = [_Counter(counterRate) for _ in range(2)]
+        counters += [_Counter(counterRate * 1e-6, saturate=True) for _ in range(15)]
+        for i, cnt in enumerate(counters):
+            self._readFn[base+0x100+4*i] = cnt
+
+        self._writeFn[base+0x000] = lambda value: [c.reset() for c in counters] if value & 1 else None
+
+    def _eyeStatus(self, delay):
+        """Status word of a timing input for a delay tap, errors in 31:16 and idle in 15:0"""
+        delay &= 0x1F
+        if self._eye[0] <= delay <= self._eye[1]:
+            return 0x0000FFFF
+        return int(min(abs(delay - sum(self._eye) / 2) * 100, 0xFFFF)) << 16
+
+    def _buildDpmTiming(self, counterRate):
+        base     = self.timingOffset
+        counters = [_Counter(counterRate) for _ in range(3)]
+
+        for off in [0x08, 0x18]:
+            self._data[base+off] = 0
+            self._readFn[base+off+4] = (lambda off=off: self._eyeStatus(self._data[base+off]))
+
+        for i, cnt in enumerate(counters):
+            self._readFn[base+0x24+4*i] = cnt
+
+        self._writeFn[base+0x20] = lambda value: [c.reset() for c in counters] if value & 1 else None
+
+    def _buildDtmTiming(self, counterRate):
+        base     = self.timingOffset
+        txCount  = [_Counter(counterRate) for _ in range(2)]
+        rxCount  = [_Counter(counterRate) for _ in range(8)]
+
+        for i in range(8):
+            self._data[base+0x100+4*i] = 0
+            self._readFn[base+0x200+4*i] = (lambda i=i: self._eyeStatus(self._data[base+0x100+4*i]))
+            self._readFn[base+0x500+4*i] = rxCount[i]
+
+        self._readFn[base+0x414] = txCount[0]
+        self._readFn[base+0x418] = txCount[1]
+
+        self._writeFn[base+0x41C] = lambda value: [c.reset() for c in txCount + rxCount] if value & 1 else None
+
+    def _doMinAccess(self):
+        return 4
+
+    def _doMaxAccess(self):
+        return 0x1000
+
+    def _process(self, transaction):
+        address = transaction.address()
+        size    = transaction.size()
+        ba      = bytearray(size)
+
+        with self._lock:
+            if transaction.type() in (rim.Write, rim.Post):
+                transaction.getData(ba, 0)
+                for i in range(0, size, 4):
+                    value = int.from_bytes(ba[i:i+4], 'little')
+                    self._data[address+i] = value
+                    if address+i in self._writeFn:
+                        self._writeFn[address+i](value)
+            else:
+                for i in range(0, size, 4):
+                    fn = self._readFn.get(address+i)
+                    value = fn() if fn is not None else self._data.get(address+i, 0)
+                    ba[i:i+4] = value.to_bytes(4, 'little')
+                transaction.setData(ba, 0)
+
+        transaction.done()
+
+    def _doTransaction(self, transaction):
+        if self._latency <= 0:
+            self._process(transaction)
+            return
+
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._queue, (time.monotonic() + self._latency, self._seq, transaction))
+            self._cond.notify()
+
+    def _completeWorker(self):
+        while True:
+            with self._cond:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    self._cond.wait(None if not self._queue else self._queue[0][0] - time.monotonic())
+                _, _, transaction = heapq.heappop(self._queue)
+
+            with transaction.lock():
+                if not transaction.expired():
+                    self._process(transaction)
+
+class RceEmulatorRoot(pr.Root):
+    """
+    Root holding the RceG3 devices of one emulated RCE, see RceEmulator for
+    the emulator arguments. The devices use the same classes and offsets
+    as on hardware.
+    """
+    def __init__(self, *, name='RceEmulatorRoot', pollEn=False, emulator=None, **kwargs):
+        emuArgs = {k: kwargs.pop(k) for k in list(kwargs) if k in RceEmulator.Arguments}
+        super().__init__(name=name, pollEn=pollEn, **kwargs)
+
+        self.emulator = RceEmulator(**emuArgs) if emulator is None else emulator
+        self.addInterface(self.emulator)
+
+        layout = self.emulator.layout
+        self.add(RceVersion(memBase=self.emulator, **layout))
+        self.add(RceBsi(memBase=self.emulator, offset=layout['bsiOffset']))
+
+        if self.emulator.ethernet:
+            self.add(RceEthernet(memBase=self.emulator))
+
+        if self.emulator.timing == 'dpm':
+            self.add(DpmTiming(memBase=self.emulator, offset=self.emulator.timingOffset))
+        elif self.emulator.timing == 'dtm':
+            self.add(DtmTiming(memBase=self.emulator, offset=self.emulator.timingOffset))
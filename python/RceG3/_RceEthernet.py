@@ -10,8 +10,17 @@
 
 import pyrogue as pr
 
-class RceEthernet(pr.Device):
-    def __init__(self, **kwargs):
+from RceG3._AsyncDevice    import AsyncDevice
+from RceG3._CounterBlock   import CounterBlock, resetCommand
+from RceG3._CounterRates   import CounterRates
+from RceG3._EthernetHealth import EthernetHealth
+from RceG3._PollCoalescer  import coalescePolls
+
+class RceEthernet(AsyncDevice, pr.Device):
+    # Only these counters roll over, the others saturate (ROLL_OVER_C in RceEthernetReg.vhd)
+    RollOverCounters = ('RxEnCount', 'TxEnCount')
+
+    def __init__(self, lineRate=10.0e9, healthThresholds=None, pollInterval=0, **kwargs):
 
         # Offset of this module is always the same
         # Override any offset passed in
@@ -21,7 +30,7 @@ class RceEthernet(pr.Device):
         self.add(pr.RemoteCommand(
             name = 'CountReset',
             offset = 0x000,
-            function = pr.RemoteCommand.toggle))
+            function = resetCommand(self, pr.RemoteCommand.toggle)))
 
         self.add(pr.RemoteVariable(
             name = 'PhyConfig',
@@ -283,3 +292,26 @@ class RceEthernet(pr.Device):
             bitSize = 32,
             base = pr.UInt,
             mode = 'RO'))
+
+        # Status counters 0x100 - 0x143, read as a single block
+        counters = [v for v in self.variables.values() if isinstance(v, pr.RemoteVariable) and v.offset >= 0x100]
+        self._counters = CounterBlock(counters, saturating=[v.name for v in counters
+                                                            if v.name not in self.RollOverCounters])
+
+        # Rates are only polled with a pollInterval, the counters are not polled otherwise
+        self._rates = CounterRates(self._counters)
+        self._rates.addVariables(self, pollInterval=pollInterval)
+
+        # Link health metrics and alarms, updated with the rates
+        self._health = EthernetHealth(self, self._rates, lineRate=lineRate, thresholds=healthThresholds)
+
+        # Read each polled register range with a single transaction
+        self._pollPlan = coalescePolls(self, extra=[(self._rates.pollInterval, self._counters.variables)])
+
+    def snapshot(self):
+        """Read all status counters in one transaction, returns a CounterSnapshot"""
+        return self._counters.read(self)
+
+    def health(self):
+        """Link health metrics and alarm states as of the last counter poll"""
+        return self._health.status()
@@ -0,0 +1,152 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import time
+import concurrent.futures
+
+from RceG3._DpmTiming   import DpmTiming
+from RceG3._DtmTiming   import DtmTiming
+from RceG3._RceVersion  import RceVersion
+from RceG3._RceBsi      import RceBsi
+from RceG3._RceEthernet import RceEthernet
+from RceG3._RceG3Dma    import RceG3DmaChan, RceG3DmaPpiChan
+
+def findDevices(node, typ):
+    """Recursively collect the devices of type typ below node"""
+    ret = []
+    for dev in node.devices.values():
+        if isinstance(dev, typ):
+            ret.append(dev)
+        ret.extend(findDevices(dev, typ))
+    return ret
+
+def deviceLocation(root):
+    """(AtcaSlot, CobBay, CobElement) from the current values of the first RceBsi or RceVersion in root"""
+    for dev in findDevices(root, (RceBsi, RceVersion)):
+        return (dev.AtcaSlot.value(), dev.CobBay.value(), dev.CobElement.value())
+    return None
+
+class FleetResult(object):
+    """Outcome of one target in a RceFleet sweep"""
+    def __init__(self, root, location=None, values=None, error=None, elapsed=None):
+        self.root     = root
+        self.location = location
+        self.values   = values if values is not None else {}
+        self.error    = error
+        self.elapsed  = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+class FleetResults(list):
+    """FleetResult of each target of a sweep, in the order of the roots"""
+
+    def byLocation(self):
+        """
+        Results grouped by (AtcaSlot, CobBay, CobElement), in root order
+        within each location. Targets which share a location, such as a
+        misconfigured crate, are all kept. Targets which have never
+        reported their location are grouped under None.
+        """
+        ret = {}
+        for res in self:
+            ret.setdefault(res.location, []).append(res)
+        return ret
+
+class RceFleet(object):
+    """
+    Reads the RceG3 devices of many independent Roots concurrently on a
+    bounded thread pool, so a crate sweep takes about as long as the
+    slowest target instead of the sum of all of them.
+
+    A target which does not complete within timeout seconds of starting is
+    reported with an error; its worker can not be interrupted and keeps its
+    pool slot until the underlying transaction returns.
+    """
+    DeviceTypes = (RceVersion, RceBsi, RceEthernet, DpmTiming, DtmTiming, RceG3DmaChan, RceG3DmaPpiChan)
+
+    def __init__(self, roots, maxWorkers=16, timeout=2.0):
+        self.roots   = list(roots)
+        self.timeout = timeout
+        self._waves  = -(-len(self.roots) // maxWorkers)
+        self._pool   = concurrent.futures.ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='RceFleet')
+        self._locations = {}
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _readTarget(self, index, started):
+        started[index] = time.monotonic()
+        devs = findDevices(self.roots[index], self.DeviceTypes)
+
+        # Issue all transactions before waiting on any of them
+        for dev in devs:
+            dev.readBlocks(recurse=False)
+        for dev in devs:
+            dev.checkBlocks(recurse=False)
+
+        values = {dev.path: {k: v.value() for k, v in dev.variables.items()} for dev in devs}
+        return values, time.monotonic() - started[index]
+
+    def sweep(self, timeout=None):
+        """
+        Read all targets, returns FleetResults in the order of roots. Each
+        result carries the (AtcaSlot, CobBay, CobElement) of its target, or
+        None for a target which has never reported its location, see
+        FleetResults.byLocation().
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = {}
+        futures = {self._pool.submit(self._readTarget, i, started): i for i in range(len(self.roots))}
+        pending = set(futures)
+        expired = set()
+        begin   = time.monotonic()
+
+        while pending:
+            done, pending = concurrent.futures.wait(pending, timeout=min(timeout, 0.05),
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            now = time.monotonic()
+            for fut in list(pending):
+                start = started.get(futures[fut])
+
+                # Targets still queued behind stuck workers expire as well
+                if start is None:
+                    if (now - begin) > timeout * (self._waves + 1):
+                        fut.cancel()
+                        pending.discard(fut)
+                        expired.add(fut)
+                elif (now - start) > timeout:
+                    pending.discard(fut)
+                    expired.add(fut)
+
+        ret = FleetResults([None] * len(self.roots))
+        for fut, i in futures.items():
+            root = self.roots[i]
+            if fut in expired:
+                res = FleetResult(root, error=f'Timeout after {timeout} s', elapsed=timeout)
+            else:
+                try:
+                    values, elapsed = fut.result()
+                    self._locations[i] = deviceLocation(root)
+                    res = FleetResult(root, values=values, elapsed=elapsed)
+                except Exception as e:
+                    res = FleetResult(root, error=str(e))
+
+            res.location = self._locations.get(i)
+            ret[i] = res
+
+        return ret
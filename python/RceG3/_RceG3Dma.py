@@ -0,0 +1,449 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+import pyrogue as pr
+
+from RceG3._AsyncDevice   import AsyncDevice
+from RceG3._CounterBlock  import CounterBlock, resetCommand
+from RceG3._CounterRates  import CounterRates
+from RceG3._PollCoalescer import coalescePolls
+
+# zynq GP0 base of the DMA AXI-Lite blocks per RCE_DMA_MODE_G, see
+# genGp0Config. addr(23:16) selects the block, channel i uses block 2*i.
+# On zynquplus block i is at 0xA4000000 + (i+1)*0x10000, a base of
+# 0xA4010000.
+DmaAxilBase = {
+    'Ppi'    : 0x50000000,
+    'AxisV2' : 0x60000000,
+}
+
+DmaBlockStride = 0x10000
+
+# Return ring entries, DESC_AWIDTH_G of RceG3DmaAxisV2Chan
+DmaRingSize = 4096
+
+# Derived channel metrics as (name, units, description)
+DmaMetrics = (
+    ('IbFrameRate',     'Hz',   'Inbound frames written to memory'),
+    ('ObFrameRate',     'Hz',   'Outbound frames read from memory'),
+    ('IbThroughput',    'MB/s', 'Inbound buffer bandwidth, IbFrameRate times MaxSize'),
+    ('ObThroughput',    'MB/s', 'Outbound buffer bandwidth, ObFrameRate times MaxSize'),
+    ('IbRingDepth',     '',     'Inbound descriptors returned during the last poll'),
+    ('ObRingDepth',     '',     'Outbound descriptors returned during the last poll'),
+    ('IbRingDepthMean', '',     'Moving average of IbRingDepth'),
+    ('ObRingDepthMean', '',     'Moving average of ObRingDepth'),
+    ('IbRingDepthMax',  '',     'Largest IbRingDepth since the last stats reset'),
+    ('ObRingDepthMax',  '',     'Largest ObRingDepth since the last stats reset'),
+)
+
+class DmaThroughput(object):
+    """
+    Frame rates, buffer bandwidth and return ring depth statistics of a
+    RceG3DmaChan, updated from the ring index deltas of each CounterRates
+    poll with no extra register reads.
+
+    The engine counts no bytes, so the bandwidth assumes every frame fills
+    a MaxSize buffer and is an upper bound of the payload rate. A ring
+    index which moves by half the ring or more in one poll may have
+    wrapped unseen; RingAliased is set and the poll interval should be
+    shortened. The mean depth is an exponential average with weight alpha.
+    """
+    def __init__(self, dev, rates, ringSize=DmaRingSize, alpha=0.1):
+        self._dev     = dev
+        self.ringSize = ringSize
+        self.alpha    = alpha
+        self.names    = tuple(m[0] for m in DmaMetrics)
+        self.metrics  = np.zeros(len(self.names), dtype=np.float64)
+        self.aliased  = False
+
+        index = rates.block.index
+        self._index = np.array([index['HwWrIndex'], index['HwRdIndex']])
+
+        self._addVariables(dev)
+        self.resetStats()
+        rates.addListener(self.update)
+
+    def _addVariables(self, dev):
+        self._metricVars = []
+
+        for name, units, desc in DmaMetrics:
+            var = pr.LocalVariable(
+                name        = name,
+                description = desc,
+                mode        = 'RO',
+                value       = 0.0,
+                units       = units,
+                disp        = '{:.3g}')
+            dev.add(var)
+            self._metricVars.append(var)
+
+        self._aliasedVar = pr.LocalVariable(
+            name        = 'RingAliased',
+            description = 'A ring index moved by half the ring or more in one poll, rates may be low',
+            mode        = 'RO',
+            value       = False)
+        dev.add(self._aliasedVar)
+
+        dev.add(pr.LocalCommand(
+            name        = 'ResetStats',
+            description = 'Restart the ring depth mean and maximum',
+            function    = lambda: self.resetStats()))
+
+    def resetStats(self):
+        self._first = True
+        self.metrics[6:10] = 0.0
+
+    def update(self, rates):
+        """Recompute the metrics from the last ring index deltas"""
+        if rates.dt <= 0:
+            return
+
+        depth = rates.delta[self._index].astype(np.float64)
+        fps   = depth / rates.dt
+        size  = self._dev.MaxSize.value()
+        m     = self.metrics
+
+        m[0:2] = fps
+        m[2:4] = fps * size / 1.0e6
+        m[4:6] = depth
+
+        if self._first:
+            m[6:8] = depth
+            self._first = False
+        else:
+            m[6:8] += self.alpha * (depth - m[6:8])
+        m[8:10] = np.maximum(m[8:10], depth)
+
+        for var, value in zip(self._metricVars, m):
+            var.set(float(value))
+
+        aliased = bool((depth >= self.ringSize // 2).any())
+        if aliased != self.aliased:
+            self.aliased = aliased
+            self._aliasedVar.set(aliased)
+
+    def status(self):
+        """Current metrics by name"""
+        ret = {n: float(v) for n, v in zip(self.names, self.metrics)}
+        ret['RingAliased'] = self.aliased
+        return ret
+
+class RceG3DmaChan(AsyncDevice, pr.Device):
+    """
+    One RceG3DmaAxisV2 channel, the register space of the surf
+    AxiStreamDmaV2 descriptor engine. The ring indexes and the miss and
+    interrupt counters are read in one burst per poll, from which frame
+    rates, buffer bandwidth and ring depth statistics are derived. The
+    kernel driver owns the engine, so every register is read only.
+    """
+
+    CounterNames = ('IntReqCount', 'HwWrIndex', 'HwRdIndex', 'WrReqMissed')
+
+    def __init__(self, pollInterval=1, **kwargs):
+        super().__init__(description='RceG3 AXI stream DMA channel.', **kwargs)
+
+        # 0x40-0x4C are the descriptor FIFOs, reading them pops an entry,
+        # so no variable covers them
+        self.add(pr.RemoteVariable(
+            name        = 'Enable',
+            description = 'Descriptor engine enable',
+            offset      = 0x00,
+            bitSize     = 1,
+            base        = pr.Bool,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'Version',
+            description = 'Descriptor engine version',
+            offset      = 0x00,
+            bitSize     = 8,
+            bitOffset   = 24,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'IntEnable',
+            description = 'Interrupt enable',
+            offset      = 0x04,
+            bitSize     = 1,
+            base        = pr.Bool,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'ContEnable',
+            description = 'Continue frames over buffers',
+            offset      = 0x08,
+            bitSize     = 1,
+            base        = pr.Bool,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'DropEnable',
+            description = 'Drop frames when no buffer is free',
+            offset      = 0x0C,
+            bitSize     = 1,
+            base        = pr.Bool,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'MaxSize',
+            description = 'Buffer size',
+            offset      = 0x28,
+            mode        = 'RO',
+            units       = 'B',
+            disp        = '{:d}',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'Online',
+            description = 'Online state to the user logic',
+            offset      = 0x2C,
+            bitSize     = 1,
+            base        = pr.Bool,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'Acknowledge',
+            description = 'Rising edge pulses the user state',
+            offset      = 0x30,
+            bitSize     = 1,
+            base        = pr.Bool,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'ChanCount',
+            description = 'Channels of the descriptor engine',
+            offset      = 0x34,
+            bitSize     = 8,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'AddrWidth',
+            description = 'AXI address width',
+            offset      = 0x38,
+            bitSize     = 8,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'IntReqCount',
+            description = 'Interrupt requests',
+            offset      = 0x50,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'HwWrIndex',
+            description = 'Inbound return ring index',
+            offset      = 0x54,
+            bitSize     = 12,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'HwRdIndex',
+            description = 'Outbound return ring index',
+            offset      = 0x58,
+            bitSize     = 12,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'WrReqMissed',
+            description = 'Inbound frames which found no free buffer',
+            offset      = 0x5C,
+            mode        = 'RO',
+        ))
+
+        # 0x50 - 0x5C, read as a single block
+        self._counters = CounterBlock([getattr(self, name) for name in self.CounterNames])
+
+        self._rates = CounterRates(self._counters)
+        self._rates.addVariables(self, pollInterval=pollInterval)
+
+        self._throughput = DmaThroughput(self, self._rates)
+
+        # Read each polled register range with a single transaction
+        self._pollPlan = coalescePolls(self, extra=[(self._rates.pollInterval, self._counters.variables)])
+
+    def snapshot(self):
+        """Read the ring indexes and counters in one transaction, returns a CounterSnapshot"""
+        return self._counters.read(self)
+
+    def throughput(self):
+        """Frame rates, bandwidth and ring depth statistics as of the last poll"""
+        return self._throughput.status()
+
+class RceG3DmaPpiChan(AsyncDevice, pr.Device):
+    """
+    Register block of one RceG3DmaPpi socket. The firmware counts AXI
+    errors only, saturating at 255, so there are no frame or byte rates
+    for this engine. Online and User belong to the kernel driver and are
+    read only.
+    """
+
+    CounterNames = ('ObHeadAxiErrors', 'ObPayAxiErrors', 'IbHeadAxiErrors', 'IbPayAxiErrors', 'ReqErrors')
+
+    def __init__(self, pollInterval=1, **kwargs):
+        super().__init__(description='RceG3 PPI DMA socket.', **kwargs)
+
+        self.add(pr.RemoteVariable(
+            name        = 'Online',
+            description = 'Online state to the user logic',
+            offset      = 0x00,
+            bitSize     = 1,
+            base        = pr.Bool,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'User',
+            description = 'User state',
+            offset      = 0x00,
+            bitSize     = 1,
+            bitOffset   = 1,
+            base        = pr.Bool,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'ObHeadAxiErrors',
+            description = 'Outbound header AXI errors',
+            offset      = 0x10,
+            bitSize     = 8,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'ObPayAxiErrors',
+            description = 'Outbound payload AXI errors',
+            offset      = 0x14,
+            bitSize     = 8,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'IbHeadAxiErrors',
+            description = 'Inbound header AXI errors',
+            offset      = 0x18,
+            bitSize     = 8,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'IbPayAxiErrors',
+            description = 'Inbound payload AXI errors',
+            offset      = 0x1C,
+            bitSize     = 8,
+            mode        = 'RO',
+        ))
+
+        self.add(pr.RemoteVariable(
+            name        = 'ReqErrors',
+            description = 'Request errors',
+            offset      = 0x20,
+            bitSize     = 8,
+            mode        = 'RO',
+        ))
+
+        self.addRemoteVariables(
+            name        = 'Debug',
+            description = 'Engine debug words',
+            offset      = 0x80,
+            number      = 13,
+            stride      = 4,
+            mode        = 'RO',
+            hidden      = True,
+            bulkOpEn    = False,
+        )
+
+        self.add(pr.RemoteCommand(
+            name='CountReset',
+            offset=0x0C,
+            function=resetCommand(self, pr.RemoteCommand.touchOne),
+        ))
+
+        # 0x10 - 0x23, read as a single block, every counter saturates
+        self._counters = CounterBlock([getattr(self, name) for name in self.CounterNames],
+                                      saturating=self.CounterNames)
+
+        self._rates = CounterRates(self._counters)
+        self._rates.addVariables(self, pollInterval=pollInterval)
+
+        self._pollPlan = coalescePolls(self, extra=[(self._rates.pollInterval, self._counters.variables)])
+
+    def snapshot(self):
+        """Read the error counters in one transaction, returns a CounterSnapshot"""
+        return self._counters.read(self)
+
+class RceG3Dma(pr.Device):
+    """
+    DMA engines of an RCE for the RCE_DMA_MODE_G of its firmware, 'AxisV2'
+    or 'Ppi', one Channel[i] per engine. As in the firmware the AxisV2
+    channels are 0 to DMA_CH_COUNT_C, which is 2 with USE_DMA_ETH_G, as
+    the Ethernet engine then takes the last blocks, and 3 without. The
+    AXI-Lite base is a parameter as it differs between the zynq and the
+    zynquplus address maps. RceG3DmaQueue4x2 has no register interface
+    and the legacy AXI stream engine of the Ethernet channel is not
+    modelled.
+    """
+    ChannelTypes = {
+        'AxisV2' : RceG3DmaChan,
+        'Ppi'    : RceG3DmaPpiChan,
+    }
+
+    def __init__(
+            self,
+            mode         = 'AxisV2',
+            useDmaEth    = True,  # USE_DMA_ETH_G of the firmware
+            base         = None,  # DMA AXI-Lite base (zynq=DmaAxilBase[mode], zynquplus=0xA4010000)
+            channels     = None,  # Default all channels of the mode
+            pollInterval = 1,
+            **kwargs):
+
+        if mode not in self.ChannelTypes:
+            raise ValueError(f'Unsupported DMA mode {mode}, expected one of {list(self.ChannelTypes)}')
+
+        super().__init__(
+            description = f'RceG3 {mode} DMA engines.',
+            offset      = DmaAxilBase[mode] if base is None else base,
+            **kwargs)
+
+        cls = self.ChannelTypes[mode]
+        self.dmaMode   = mode
+        self.useDmaEth = useDmaEth
+
+        if channels is None:
+            channels = range((2 if useDmaEth else 3) + 1) if mode == 'AxisV2' else range(4)
+
+        for i in channels:
+            self.add(cls(
+                name         = f'Channel[{i}]',
+                offset       = 2*i*DmaBlockStride,
+                pollInterval = pollInterval))
+
+    def channels(self):
+        return [d for d in self.devices.values() if isinstance(d, (RceG3DmaChan, RceG3DmaPpiChan))]
+
+    def snapshot(self):
+        """CounterSnapshot of each channel by name, one transaction per channel"""
+        return {d.name: d.snapshot() for d in self.channels()}
+
+    def throughput(self):
+        """Throughput statistics of each AxisV2 channel by name"""
+        return {d.name: d.throughput() for d in self.channels() if isinstance(d, RceG3DmaChan)}
@@ -10,16 +10,84 @@
 # contained in the LICENSE.txt file.
 #-----------------------------------------------------------------------------
 
-import parse
+import dataclasses
+import json
 import pyrogue as pr
 
-class RceVersion(pr.Device):
+from RceG3._AsyncDevice   import AsyncDevice
+from RceG3._IdentityCache import IdentityCache
+from RceG3._RceBsi        import BsiFields, addBsiRegisters, refreshBsi
+
+# BuildStamp layout, compiled once for all instances on first use
+BuildStampFields = ('ImageName', 'BuildEnv', 'BuildServer', 'BuildDate', 'Builder')
+BuildStampFormat = "{ImageName}: {BuildEnv}, {BuildServer}, Built {BuildDate} by {Builder}"
+
+_buildStampParser = None
+
+def buildStampParser():
+    """Compiled BuildStamp pattern, parse is only imported when a BuildStamp is decoded"""
+    global _buildStampParser
+    if _buildStampParser is None:
+        import parse
+        _buildStampParser = parse.compile(BuildStampFormat)
+    return _buildStampParser
+
+def gitHashShort(gitHash):
+    return f'{(gitHash >> 132):x}'
+
+def _words(data, count):
+    return list(data) if count > 1 else [data]
+
+@dataclasses.dataclass(frozen=True)
+class RceStatus:
+    """Version, identity and location of an RCE, see RceVersion.status()"""
+    FpgaVersion  : int
+    ScratchPad   : int
+    RceVersion   : int
+    DeviceDna    : int
+    EFuseValue   : int
+    EthMode      : int
+    HeartBeat    : int
+    GitHash      : int
+    GitHashShort : str
+    BuildStamp   : str
+    ImageName    : str
+    BuildEnv     : str
+    BuildServer  : str
+    BuildDate    : str
+    Builder      : str
+    SerialNumber : int
+    AtcaSlot     : int
+    CobBay       : int
+    CobElement   : int
+
+    def asDict(self):
+        return dataclasses.asdict(self)
+
+    def toJson(self, **kwargs):
+        return json.dumps(self.asDict(), **kwargs)
+
+    def table(self):
+        """(name, text) rows, integers in hex except the location"""
+        rows = []
+        for name, value in self.asDict().items():
+            if isinstance(value, int) and name not in ('AtcaSlot', 'CobBay', 'CobElement'):
+                value = hex(value)
+            rows.append((name, str(value)))
+        return rows
+
+class RceVersion(AsyncDevice, pr.Device):
+
+    # Registers which only change when the FPGA is reprogrammed
+    IdentityVariables = ('EFuseValue', 'BuildStamp', 'SerialNumber')
+
     def __init__(
             self,
             description = 'Container for RceVersion Module',
             offset      = 0x00000000, # Unused
             intOffset   = 0x80000000, # Internal registers offset (zynq=0x80000000, zynquplus=0xB0000000)
             bsiOffset   = 0x84000000, # BSI I2C Slave Registers   (zynq=0x84000000, zynquplus=0xB0010000)
+            identityCache = None,     # Path or IdentityCache for the static registers
             **kwargs):
 
         super().__init__(
@@ -27,6 +95,19 @@ class RceVersion(pr.Device):
             offset      = 0x00000000, #This module using absolute address (not offsets)
             **kwargs)
 
+        if isinstance(identityCache, str):
+            identityCache = IdentityCache(identityCache)
+
+        self._intOffset     = intOffset
+        self._bsiOffset     = bsiOffset
+        self._identityCache = identityCache
+        self._identityKey   = None         # Cache key of the loaded identity
+        self._bsi           = None         # BSI fields of the last refreshBsi()
+        self._buildStamp    = (None, None) # Last decoded (raw, fields)
+
+        # Static registers served from the cache are skipped by bulk reads
+        bulkRead = identityCache is None
+
         self.add(pr.RemoteVariable(
             name        = 'FpgaVersion',
             description = 'Fpga firmware version number',
@@ -61,6 +142,7 @@ class RceVersion(pr.Device):
             description = 'Xilinx E-Fuse Value',
             offset      = intOffset+0x30,
             mode        = 'RO',
+            bulkOpEn    = bulkRead,
         ))
 
         self.add(pr.RemoteVariable(
@@ -93,7 +175,7 @@ class RceVersion(pr.Device):
             name         = 'GitHashShort',
             mode         = 'RO',
             dependencies = [self.GitHash],
-            linkedGet    = lambda read: f'{(self.GitHash.get(read=read) >> 132):x}'
+            linkedGet    = lambda read: gitHashShort(self.GitHash.get(read=read))
         ))
 
         self.add(pr.RemoteVariable(
@@ -104,48 +186,15 @@ class RceVersion(pr.Device):
             base         = pr.String,
             mode         = 'RO',
             hidden       = True,
+            bulkOpEn     = bulkRead,
         ))
 
-        self.add(pr.RemoteVariable(
-            name        = 'SerialNumber',
-            description = 'Serial Number',
-            offset      = bsiOffset+0x140,
-            bitSize     = 64,
-            mode        = 'RO',
-        ))
-
-        self.add(pr.RemoteVariable(
-            name        = 'AtcaSlot',
-            description = 'ATCA Slot',
-            offset      = bsiOffset+0x148,
-            bitSize     = 8,
-            bitOffset   = 16,
-            mode        = 'RO',
-        ))
-
-        self.add(pr.RemoteVariable(
-            name        = 'CobBay',
-            description = 'COB Bay',
-            offset      = bsiOffset+0x148,
-            bitSize     = 8,
-            bitOffset   = 8,
-            mode        = 'RO',
-        ))
-
-        self.add(pr.RemoteVariable(
-            name        = 'CobElement',
-            description = 'COB Element',
-            offset      = bsiOffset+0x148,
-            bitSize     = 8,
-            mode        = 'RO',
-        ))
+        addBsiRegisters(self, bsiOffset)
 
+        # Each field reads BuildStamp when read with read=True, only the parse
+        # is shared. buildInfo() reads it once for all fields.
         def parseBuildStamp(var, read):
-            p = parse.parse("{ImageName}: {BuildEnv}, {BuildServer}, Built {BuildDate} by {Builder}", var.dependencies[0].get(read=read))
-            if p is None:
-                return ''
-            else:
-                return p[var.name]
+            return self.decodeBuildStamp(var.dependencies[0].get(read=read))[var.name]
 
         self.add(pr.LinkVariable(
             name = 'ImageName',
@@ -177,6 +226,69 @@ class RceVersion(pr.Device):
             linkedGet = parseBuildStamp,
             variable = self.BuildStamp))
 
+    def _start(self):
+        super()._start()
+
+        try:
+            self.refreshBsi()
+        except Exception as e:
+            self._log.warning(f'BSI read failed: {e}')
+
+        if self._identityCache is not None:
+            self.loadIdentity()
+
+    def refreshBsi(self):
+        """Read the BSI registers in one transaction, e.g. after a hot-swap"""
+        self._bsi = refreshBsi(self)
+        return self._bsi
+
+    def loadIdentity(self):
+        """
+        Validate the identity cache with a single read of the internal
+        registers, then fill the static registers from the cache. On a miss
+        the static registers are read from hardware and stored.
+        """
+        w = self._rawRead(offset=self._intOffset, numWords=0x54//4)
+
+        fpgaVersion = w[0]
+        deviceDna   = w[8] | (w[9] << 32)
+        gitHash     = sum(v << (32*i) for i, v in enumerate(w[16:21]))
+
+        self.FpgaVersion.set(fpgaVersion, write=False)
+        self.DeviceDna.set(deviceDna, write=False)
+        self.GitHash.set(gitHash, write=False)
+
+        key   = IdentityCache.key(deviceDna, fpgaVersion, gitHash)
+        entry = self._identityCache.get(key)
+
+        if entry is None:
+            # BSI registers are already read at start
+            entry = {name: getattr(self, name).get(read=name not in BsiFields) for name in self.IdentityVariables}
+            self._identityCache.put(key, entry)
+        else:
+            for name, value in entry.items():
+                getattr(self, name).set(value, write=False)
+
+        self._identityKey = key
+        return key
+
+    def decodeBuildStamp(self, stamp):
+        """Return the BuildStamp fields, the string is only parsed again when it changes"""
+        raw, fields = self._buildStamp
+
+        if stamp != raw or fields is None:
+            p = buildStampParser().parse(stamp)
+            fields = dict.fromkeys(BuildStampFields, '') if p is None else p.named
+            self._buildStamp = (stamp, fields)
+
+        return fields
+
+    def buildInfo(self, read=True):
+        """Decoded BuildStamp fields plus GitHash, each register is read at most once"""
+        info = dict(self.decodeBuildStamp(self.BuildStamp.get(read=read)))
+        info['GitHash'] = self.GitHash.get(read=read)
+        info['GitHashShort'] = gitHashShort(info['GitHash'])
+        return info
 
     def hardReset(self):
         print('RceVersion hard reset called')
@@ -187,16 +299,60 @@ class RceVersion(pr.Device):
     def countReset(self):
         print('RceVersion count reset called')
 
+    def status(self):
+        """
+        RceStatus from one read of the internal registers 0x00-0x53. The
+        BSI fields are the values of the last refreshBsi(), which is only
+        called here if the BSI was never read. With an identity cache the
+        EFuseValue, BuildStamp and SerialNumber come from the cache, which
+        is loaded again if the firmware changed, otherwise the BuildStamp
+        is read as well. The variable values are updated from the same data.
+        """
+        w = _words(self._rawRead(offset=self._intOffset, numWords=0x54//4), 0x54//4)
+        gitHash = sum(int(v) << (32*i) for i, v in enumerate(w[16:21]))
+
+        values = {
+            'FpgaVersion'  : int(w[0]),
+            'ScratchPad'   : int(w[1]),
+            'RceVersion'   : int(w[2]),
+            'DeviceDna'    : int(w[8]) | (int(w[9]) << 32),
+            'EthMode'      : int(w[13]),
+            'HeartBeat'    : int(w[14]),
+            'GitHash'      : gitHash,
+        }
+
+        for name, value in values.items():
+            getattr(self, name).set(value, write=False)
+
+        if self._bsi is None:
+            self.refreshBsi()
+
+        if self._identityCache is None:
+            stampWords = _words(self._rawRead(offset=self._intOffset+0x1000, numWords=64), 64)
+            stamp = b''.join(int(x).to_bytes(4, 'little') for x in stampWords).split(b'\0')[0].decode(errors='replace')
+            values['EFuseValue'] = int(w[12])
+            values['BuildStamp'] = stamp
+            self.EFuseValue.set(values['EFuseValue'], write=False)
+            self.BuildStamp.set(stamp, write=False)
+        else:
+            if IdentityCache.key(values['DeviceDna'], values['FpgaVersion'], gitHash) != self._identityKey:
+                self.loadIdentity()
+            values['EFuseValue'] = self.EFuseValue.value()
+            values['BuildStamp'] = self.BuildStamp.value()
+
+        values.update({name: getattr(self, name).value() for name in BsiFields})
+
+        return RceStatus(GitHashShort=gitHashShort(gitHash), **values, **self.decodeBuildStamp(values['BuildStamp']))
+
     def printStatus(self):
-        self.BuildStamp.get()
-        gitHash = self.GitHash.get()
-        print("FwVersion    = {}".format(hex(self.FpgaVersion.get())))
-        if (gitHash != 0):
-            print("GitHash      = {}".format(hex(self.GitHash.get())))
+        st = self.status()
+        print("FwVersion    = {}".format(hex(st.FpgaVersion)))
+        if (st.GitHash != 0):
+            print("GitHash      = {}".format(hex(st.GitHash)))
         else:
             print("GitHash      = dirty (uncommitted code)")
-        print("FwTarget     = {}".format(self.ImageName.get()))
-        print("BuildEnv     = {}".format(self.BuildEnv.get()))
-        print("BuildServer  = {}".format(self.BuildServer.get()))
-        print("BuildDate    = {}".format(self.BuildDate.get()))
-        print("Builder      = {}".format(self.Builder.get()))
+        print("FwTarget     = {}".format(st.ImageName))
+        print("BuildEnv     = {}".format(st.BuildEnv))
+        print("BuildServer  = {}".format(st.BuildServer))
+        print("BuildDate    = {}".format(st.BuildDate))
+        print("Builder      = {}".format(st.Builder))
@@ -1,5 +1,48 @@
-from RceG3._DpmTiming import *
-from RceG3._DtmTiming import *
-from RceG3._RceVersion import *
-from RceG3._RceBsi import *
-from RceG3._RceEthernet import *
+#-----------------------------------------------------------------------------
+# Public names are imported from their module on first access, so importing
+# the package, or a single device, does not load the others.
+#-----------------------------------------------------------------------------
+import importlib
+
+_modules = {
+    '_DpmTiming'       : ['DpmTiming'],
+    '_DtmTiming'       : ['DtmTiming'],
+    '_RceVersion'      : ['RceVersion', 'BuildStampFields', 'BuildStampFormat', 'buildStampParser', 'gitHashShort', 'RceStatus'],
+    '_RceBsi'          : ['RceBsi', 'BsiFields', 'addBsiRegisters', 'refreshBsi'],
+    '_RceEthernet'     : ['RceEthernet'],
+    '_CounterBlock'    : ['CounterBlock', 'CounterSnapshot', 'CounterLayout', 'counterLayout', 'resetCommand'],
+    '_CounterRates'    : ['CounterRates', 'rateName'],
+    '_RceFleet'        : ['RceFleet', 'FleetResult', 'FleetResults', 'findDevices', 'deviceLocation'],
+    '_IdentityCache'   : ['IdentityCache'],
+    '_EyeScan'         : ['EyeScan', 'EyeScanTaps', 'eyeScanAll'],
+    '_PollCoalescer'   : ['coalescePolls', 'PollPlan', 'byteRange'],
+    '_CounterRecorder' : ['CounterRecorder'],
+    '_RceEmulator'     : ['RceEmulator', 'RceEmulatorRoot', 'RceLayouts', 'RceEthernetOffset'],
+    '_EthernetHealth'  : ['EthernetHealth', 'HealthMetrics', 'HealthThresholds'],
+    '_AsyncDevice'     : ['AsyncDevice', 'TransactionCompleter'],
+    '_Profiler'        : ['Profiler', 'LatencyHistogram'],
+    '_MetricsExporter' : ['MetricsExporter', 'SnapshotCache', 'metricName'],
+    '_DeltaPublisher'  : ['DeltaFilter', 'DeltaPublisher', 'DeltaZmqServer'],
+    '_HeartBeatWatchdog' : ['HeartBeatWatchdog', 'HeartBeatDevice', 'WatchdogState', 'StatusNames'],
+    '_ConfigSnapshot'  : ['ConfigSnapshot', 'ConfigRegisters', 'RwLayout'],
+    '_BerTester'       : ['BerTester', 'BerLink', 'wilson'],
+    '_CrateTopology'   : ['CrateTopology', 'RceEntry', 'readIdentity'],
+    '_AdaptivePoller'  : ['AdaptivePoller', 'PollGroup'],
+    '_RceG3Dma'        : ['RceG3Dma', 'RceG3DmaChan', 'RceG3DmaPpiChan', 'DmaThroughput', 'DmaMetrics', 'DmaAxilBase'],
+}
+
+_names = {name: mod for mod, names in _modules.items() for name in names}
+
+__all__ = list(_names)
+
+def __getattr__(name):
+    mod = _names.get(name)
+    if mod is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(importlib.import_module(f'{__name__}.{mod}'), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_names))
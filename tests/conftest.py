@@ -0,0 +1,39 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+#
+# Tests run from the source tree. Tests of modules which need pyrogue skip
+# themselves when it is not installed.
+#
+#    $ python -m pytest -q tests
+#
+#-----------------------------------------------------------------------------
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python'))
+
+@pytest.fixture
+def emulatorRoot():
+    """Factory of started RceEmulatorRoots, stopped after the test"""
+    roots = []
+
+    def _make(**kwargs):
+        import RceG3
+        root = RceG3.RceEmulatorRoot(**kwargs)
+        root.start()
+        roots.append(root)
+        return root
+
+    yield _make
+
+    for root in roots:
+        root.stop()
@@ -0,0 +1,69 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import pytest
+
+pytest.importorskip('pyrogue')
+
+import RceG3  # noqa: E402
+
+def publish(poller, var, value):
+    poller._varUpdated(var.path, types.SimpleNamespace(value=value))
+
+def age(poller, seconds):
+    for g in poller.groups:
+        g.lastChange -= seconds
+
+@pytest.fixture
+def timing(emulatorRoot):
+    root   = emulatorRoot(timing='dpm')
+    poller = RceG3.AdaptivePoller(root, maxInterval=8, backoff=2)
+    groups = {g.name: g for g in poller.groups}
+    dev    = root.DpmTiming
+    return poller, dev, groups[dev.RxErrors0.path], groups[dev.RxIdle0.path]
+
+def test_shared_block_backs_off_per_register(timing):
+    poller, dev, errors, idle = timing
+    assert errors is not idle
+    assert dev.RxErrors0._block is dev.RxIdle0._block
+
+    publish(poller, dev.RxErrors0, 0)
+    publish(poller, dev.RxIdle0, 0)
+    for i in range(1, 4):
+        age(poller, 100)
+        publish(poller, dev.RxIdle0, i)
+        poller.update()
+
+    assert idle.interval == 1
+    assert errors.interval == 8
+    assert dev.RxErrors0.pollInterval == 8
+
+    # An error sets the register back to its declared interval at once
+    publish(poller, dev.RxErrors0, 1)
+    assert errors.interval == 1
+    assert dev.RxErrors0.pollInterval == 1
+
+def test_block_load_at_fastest_register(timing):
+    poller, dev, errors, idle = timing
+    base = poller.load(dev)
+
+    errors.setInterval(8)
+    assert poller.load(dev) == base
+
+    idle.setInterval(8)
+    assert poller.load(dev) < base
+
+def test_restore(timing):
+    poller, dev, errors, idle = timing
+    errors.setInterval(4)
+    poller.restore()
+    assert errors.interval == 1
+    assert dev.RxErrors0.pollInterval == 1
@@ -0,0 +1,54 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import asyncio
+import threading
+import pytest
+
+pytest.importorskip('pyrogue')
+
+import RceG3  # noqa: E402
+
+def test_read_many_roots(emulatorRoot):
+    roots = [emulatorRoot(name=f'Rce{i}', latency=0.01, seed=i) for i in range(4)]
+
+    async def readAll():
+        return await asyncio.gather(*[r.RceVersion.readAsync(['FpgaVersion', 'DeviceDna']) for r in roots])
+
+    values = asyncio.run(readAll())
+    assert [v['FpgaVersion'] for v in values] == [0xC0DE0100] * 4
+    assert [v['DeviceDna'] for v in values] == [r.RceVersion.DeviceDna.value() for r in roots]
+
+def test_write_then_read(emulatorRoot):
+    ver = emulatorRoot().RceVersion
+
+    async def run():
+        await ver.writeAsync({'ScratchPad': 0xCAFE})
+        return await ver.readAsync(['ScratchPad'])
+
+    assert asyncio.run(run()) == {'ScratchPad': 0xCAFE}
+
+def test_snapshot(emulatorRoot):
+    eth  = emulatorRoot().RceEthernet
+    snap = asyncio.run(eth.snapshotAsync())
+    assert snap.names == eth._counters.names
+
+def test_threads_stop_with_root():
+    root = RceG3.RceEmulatorRoot(name='AsyncStop')
+    root.start()
+    try:
+        asyncio.run(root.RceVersion.readAsync(['FpgaVersion']))
+        names = {t.name for t in threading.enumerate()}
+        assert {'AsyncStop.Starter', 'AsyncStop.Completer'} <= names
+    finally:
+        root.stop()
+
+    names = {t.name for t in threading.enumerate()}
+    assert not names & {'AsyncStop.Starter', 'AsyncStop.Completer'}
@@ -0,0 +1,55 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pytest
+
+from RceG3._BerTester import BerLink, wilson
+
+def test_wilson_known_value():
+    # 10 of 100 at 95%, textbook interval 0.0552 - 0.1744
+    low, high = wilson(10, 100)
+    assert low == pytest.approx(0.0552, abs=1e-4)
+    assert high == pytest.approx(0.1744, abs=1e-4)
+
+def test_wilson_zero_errors():
+    low, high = wilson(0, 10**6)
+    assert low == 0.0
+    assert 0.0 < high < 4.0e-6
+
+def test_wilson_all():
+    low, high = wilson(50, 50)
+    assert high == 1.0
+    assert 0.9 < low < 1.0
+
+def test_wilson_empty():
+    assert wilson(0, 0) == (0.0, 1.0)
+
+def test_wilson_narrows_with_samples():
+    widths = [wilson(n // 100, n)[1] - wilson(n // 100, n)[0] for n in (10**3, 10**4, 10**5)]
+    assert widths[0] > widths[1] > widths[2]
+
+def test_wilson_contains_estimate():
+    for k, n in [(1, 3), (7, 1000), (999, 1000)]:
+        low, high = wilson(k, n)
+        assert low <= k / n <= high
+
+def test_link_rates():
+    link = BerLink('Root.DpmTiming', 0, sent=1000, received=990, errors=3, saturated=False, z=1.96)
+    assert link.lost == 10
+    assert link.lossRate == 0.01
+    assert link.errorRate == 3 / 990
+    assert link.lossBounds == wilson(10, 1000)
+    assert link.asDict()['channel'] == 0
+
+def test_link_nothing_sent():
+    link = BerLink('Root.DpmTiming', 1, sent=0, received=5, errors=0, saturated=False, z=1.96)
+    assert link.lost == 0
+    assert link.lossRate == 0.0
+    assert link.lossBounds == (0.0, 1.0)
@@ -0,0 +1,69 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pytest
+
+pytest.importorskip('pyrogue')
+
+import RceG3  # noqa: E402
+
+def test_layout_uses_allow_list(emulatorRoot):
+    dpm = emulatorRoot(name='Dpm', timing='dpm')
+    dtm = emulatorRoot(name='Dtm', timing='dtm')
+
+    assert [v.name for v in RceG3.RwLayout(dpm.DpmTiming).variables] == ['RxDelay0', 'RxDelay1']
+    assert [v.name for v in RceG3.RwLayout(dpm.RceEthernet).variables] == ['IpAddressRaw']
+    assert [v.name for v in RceG3.RwLayout(dpm.RceVersion).variables] == ['ScratchPad']
+    assert [v.name for v in RceG3.RwLayout(dtm.DtmTiming).variables] == [f'FbDelay[{i}]' for i in range(8)]
+    assert RceG3.RwLayout(dpm.RceBsi).variables == []
+
+def test_save_restore(emulatorRoot, tmp_path):
+    dpm = emulatorRoot(name='Dpm', timing='dpm')
+    dtm = emulatorRoot(name='Dtm', timing='dtm')
+
+    dpm.DpmTiming.RxDelay1.set(7)
+    dtm.DtmTiming.FbDelay[3].set(12)
+    dpm.RceVersion.ScratchPad.set(0xABCD)
+
+    path = str(tmp_path / 'config.json')
+    RceG3.ConfigSnapshot.capture([dpm, dtm]).save(path)
+    snap = RceG3.ConfigSnapshot.load(path)
+    assert set(snap.devices) == {'Dpm.RceVersion', 'Dpm.RceEthernet', 'Dpm.DpmTiming',
+                                 'Dtm.RceVersion', 'Dtm.RceEthernet', 'Dtm.DtmTiming'}
+
+    dpm.DpmTiming.RxDelay1.set(3)
+    dtm.DtmTiming.FbDelay[3].set(30)
+    dtm.DtmTiming.FbDelay[5].set(1)
+
+    reports = {r['device']: r for r in snap.restore([dpm, dtm])}
+    assert set(reports['Dpm.DpmTiming']['changed']) == {'RxDelay1'}
+    assert set(reports['Dtm.DtmTiming']['changed']) == {'FbDelay[3]', 'FbDelay[5]'}
+    assert reports['Dtm.DtmTiming']['writes'] == 2
+    assert reports['Dpm.RceVersion']['changed'] == {}
+
+    assert dpm.DpmTiming.RxDelay1.get() == 7
+    assert dtm.DtmTiming.FbDelay[3].get() == 12
+    assert dtm.DtmTiming.FbDelay[5].get() == 0
+    assert dpm.RceVersion.ScratchPad.get() == 0xABCD
+
+def test_dry_run(emulatorRoot):
+    dpm  = emulatorRoot(timing='dpm')
+    snap = RceG3.ConfigSnapshot.capture([dpm])
+
+    dpm.DpmTiming.RxDelay0.set(9)
+    report = {r['device']: r for r in snap.restore([dpm], dryRun=True)}
+    assert set(report[dpm.DpmTiming.path]['changed']) == {'RxDelay0'}
+    assert dpm.DpmTiming.RxDelay0.get() == 9
+
+def test_old_version_rejected(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text('{"version": 1, "devices": {}}')
+    with pytest.raises(ValueError):
+        RceG3.ConfigSnapshot.load(str(path))
@@ -0,0 +1,61 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import numpy as np
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from RceG3._CounterBlock import CounterBlock, CounterSnapshot  # noqa: E402
+
+def counter(name, offset, bitOffset=0, bitSize=32):
+    return types.SimpleNamespace(name=name, offset=offset, bitOffset=[bitOffset], bitSize=[bitSize])
+
+class RawDevice(object):
+    """Register words by byte offset, counts the raw reads"""
+    def __init__(self, words):
+        self.words = words
+        self.reads = []
+
+    def _rawRead(self, offset, numWords):
+        self.reads.append((offset, numWords))
+        data = [self.words.get(offset + 4*i, 0) for i in range(numWords)]
+        return data if numWords > 1 else data[0]
+
+def test_windows():
+    block = CounterBlock([counter('A', 0x100), counter('B', 0x104), counter('C', 0x10C), counter('D', 0x200)])
+    assert block.windows == ((0x40, 0x42), (0x43, 0x44), (0x80, 0x81))
+    assert block.numWords == 4
+
+def test_decode_fields():
+    block = CounterBlock([counter('Errors', 0x0C, 16, 16), counter('Idle', 0x0C, 0, 16), counter('Count', 0x10)])
+    values = block.decode(np.array([0x1234ABCD, 0xFFFFFFFF], dtype=np.uint32))
+    assert values.tolist() == [0x1234, 0xABCD, 0xFFFFFFFF]
+
+def test_read_one_burst_per_window():
+    block = CounterBlock([counter('A', 0x100), counter('B', 0x104), counter('C', 0x200, 0, 8)])
+    dev   = RawDevice({0x100: 1, 0x104: 2, 0x200: 0x1FF})
+    snap  = block.read(dev)
+
+    assert dev.reads == [(0x100, 2), (0x200, 1)]
+    assert isinstance(snap, CounterSnapshot)
+    assert snap.asDict() == {'A': 1, 'B': 2, 'C': 0xFF}
+    assert snap['B'] == 2
+    assert snap.record['C'] == 0xFF
+
+def test_layout_shared():
+    fields = [counter('A', 0x100), counter('B', 0x104)]
+    assert CounterBlock(fields).layout is CounterBlock(fields).layout
+
+def test_mark_reset():
+    block = CounterBlock([counter('A', 0x100)])
+    block.markReset()
+    assert block.resets == 1
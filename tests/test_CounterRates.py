@@ -0,0 +1,104 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import numpy as np
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from RceG3._CounterBlock import CounterBlock, CounterSnapshot  # noqa: E402
+from RceG3._CounterRates import CounterRates, rateName         # noqa: E402
+
+def makeBlock(saturating=()):
+    return CounterBlock([
+        types.SimpleNamespace(name='Count', offset=0x00, bitOffset=[0], bitSize=[32]),
+        types.SimpleNamespace(name='Errors', offset=0x04, bitOffset=[16], bitSize=[16]),
+    ], saturating=saturating)
+
+def snap(block, values, t):
+    return CounterSnapshot(block, np.array(values, dtype=np.uint32), t)
+
+def test_first_update_sets_baseline():
+    block = makeBlock()
+    rates = CounterRates(block)
+    rates.update(snap(block, [100, 5], 1.0))
+    assert rates.totals() == {'Count': 100, 'Errors': 5}
+    assert rates.dt == 0.0
+
+def test_rate_and_delta():
+    block = makeBlock()
+    rates = CounterRates(block)
+    rates.update(snap(block, [100, 5], 1.0))
+    rates.update(snap(block, [300, 6], 3.0))
+    assert rates.rates() == {'Count': 100.0, 'Errors': 0.5}
+    assert rates.delta.tolist() == [200, 1]
+    assert rates.dt == 2.0
+
+def test_wrap_uses_bit_size():
+    block = makeBlock()
+    rates = CounterRates(block)
+    rates.update(snap(block, [0xFFFFFFF0, 0xFFF0], 1.0))
+    rates.update(snap(block, [0x10, 0x10], 2.0))
+    assert rates.delta.tolist() == [0x20, 0x20]
+    assert rates.totals() == {'Count': 0xFFFFFFF0 + 0x20, 'Errors': 0xFFF0 + 0x20}
+
+def test_marked_reset_counts_from_zero():
+    block = makeBlock()
+    rates = CounterRates(block)
+    rates.update(snap(block, [1000, 0], 1.0))
+    rates.update(snap(block, [1100, 0], 2.0))
+
+    block.markReset()
+    rates.update(snap(block, [50, 0], 3.0))
+    assert rates.totals()['Count'] == 1150
+    assert rates.delta[0] == 50
+
+def test_unmarked_drop_is_a_wrap():
+    block = makeBlock()
+    rates = CounterRates(block)
+    rates.update(snap(block, [1000, 0], 1.0))
+    rates.update(snap(block, [50, 0], 2.0))
+    assert rates.totals()['Count'] == 50 + (1 << 32)
+
+def test_reset_restarts_accumulation():
+    block = makeBlock()
+    rates = CounterRates(block)
+    rates.update(snap(block, [1000, 0], 1.0))
+    rates.reset()
+    rates.update(snap(block, [1200, 0], 2.0))
+    assert rates.totals()['Count'] == 1200
+    assert rates.dt == 0.0
+
+def test_saturated_counter_does_not_wrap():
+    block = makeBlock(saturating=['Errors'])
+    rates = CounterRates(block)
+    rates.update(snap(block, [0, 0xFFF0], 1.0))
+    rates.update(snap(block, [10, 0xFFFF], 2.0))
+    assert rates.delta.tolist() == [10, 0xF]
+    assert rates.saturated.tolist() == [False, True]
+
+    # Held at the maximum, no events are counted
+    rates.update(snap(block, [20, 0xFFFF], 3.0))
+    assert rates.delta.tolist() == [10, 0]
+    assert rates.rates()['Errors'] == 0.0
+    assert rates.totals()['Errors'] == 0xFFFF
+
+def test_saturating_counter_drop_counts_from_zero():
+    block = makeBlock(saturating=['Errors'])
+    rates = CounterRates(block)
+    rates.update(snap(block, [0, 0xFFFF], 1.0))
+    rates.update(snap(block, [0, 3], 2.0))
+    assert rates.delta[1] == 3
+    assert not rates.saturated[1]
+
+def test_rate_name():
+    assert rateName('RxCount') == 'RxCountRate'
+    assert rateName('RxCount[3]') == 'RxCountRate[3]'
@@ -0,0 +1,89 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+from RceG3._CounterRecorder import CounterRecorder
+
+Names = ('RxCount', 'TxCount')
+
+def fill(rec, times):
+    for t in times:
+        rec.append(np.array([t, 2*t], dtype=np.uint32), float(t))
+
+def test_read_in_order(tmp_path):
+    rec = CounterRecorder(str(tmp_path / 'rec.bin'), names=Names, capacity=8)
+    fill(rec, range(5))
+
+    times, values = rec.read()
+    assert len(rec) == 5
+    assert times.tolist() == [0, 1, 2, 3, 4]
+    assert values[:, 1].tolist() == [0, 2, 4, 6, 8]
+
+def test_ring_wrap_keeps_newest(tmp_path):
+    rec = CounterRecorder(str(tmp_path / 'rec.bin'), names=Names, capacity=8)
+    fill(rec, range(13))
+
+    times, values = rec.read()
+    assert len(rec) == 8
+    assert times.tolist() == list(range(5, 13))
+    assert values[:, 0].tolist() == list(range(5, 13))
+
+def test_range_across_wrap(tmp_path):
+    rec = CounterRecorder(str(tmp_path / 'rec.bin'), names=Names, capacity=8)
+    fill(rec, range(13))
+
+    assert rec.read(start=6, stop=11)[0].tolist() == [6, 7, 8, 9, 10]
+    assert rec.read(start=9)[0].tolist() == [9, 10, 11, 12]
+    assert rec.read(stop=5)[0].tolist() == []
+
+def test_range_is_a_view_within_a_segment(tmp_path):
+    rec = CounterRecorder(str(tmp_path / 'rec.bin'), names=Names, capacity=8)
+    fill(rec, range(4))
+    assert np.shares_memory(rec.read(start=1, stop=3)[1], rec._records)
+
+def test_reopen(tmp_path):
+    path = str(tmp_path / 'rec.bin')
+    rec  = CounterRecorder(path, names=Names, capacity=8)
+    fill(rec, range(10))
+    rec.flush()
+
+    other = CounterRecorder(path, mode='r')
+    assert other.names == Names
+    assert other.capacity == 8
+    assert other.read()[0].tolist() == list(range(2, 10))
+
+def test_record_published_by_one_store(tmp_path):
+    rec = CounterRecorder(str(tmp_path / 'rec.bin'), names=Names, capacity=4)
+    fill(rec, range(6))
+
+    # One record copy, then the written count, from which head and length derive
+    assert rec._records.dtype.names == ('timestamp', 'values')
+    assert int(rec._hdr['written'][0]) == 6
+    assert len(rec) == 4
+    assert rec._records['timestamp'].tolist() == [4, 5, 2, 3]
+    assert rec._records['values'][1].tolist() == [5, 10]
+
+def test_old_version(tmp_path):
+    path = str(tmp_path / 'rec.bin')
+    CounterRecorder(path, names=Names, capacity=4)
+    hdr = np.memmap(path, dtype=CounterRecorder._header, mode='r+', shape=(1,))
+    hdr['version'][0] = 1
+    hdr.flush()
+
+    with pytest.raises(ValueError):
+        CounterRecorder(path)
+
+def test_not_a_recorder(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(bytes(4096))
+    with pytest.raises(ValueError):
+        CounterRecorder(str(path))
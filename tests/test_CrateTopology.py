@@ -0,0 +1,71 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import pytest
+
+pytest.importorskip('pyrogue')
+
+import RceG3  # noqa: E402
+
+@pytest.fixture
+def crate(emulatorRoot):
+    """Slot 1 and 2, bays 0 and 1, element 0 and 2"""
+    return [emulatorRoot(name=f'Rce{s}{b}{e}', location=(s, b, e), seed=10*s + 3*b + e)
+            for s in (1, 2) for b in (0, 1) for e in (0, 2)]
+
+def test_find(crate):
+    topo = RceG3.CrateTopology(crate)
+    assert len(topo) == 8
+
+    entry = topo.find(2, 1, 0)
+    assert entry.root is crate[6]
+    assert topo.findDna(entry.dna) is entry
+    assert topo.find(3, 0, 0) is None
+
+def test_select(crate):
+    topo = RceG3.CrateTopology(crate)
+    assert [e[:4] for e in topo.select(bay=1, element=2)] == [(None, 1, 1, 2), (None, 2, 1, 2)]
+    assert topo.roots(slot=1, bay=0) == crate[0:2]
+    assert len(topo.select()) == 8
+    assert topo.select(slot=7) == []
+    with pytest.raises(ValueError):
+        topo.select(shelf=1)
+
+def test_crate_labels(crate):
+    topo = RceG3.CrateTopology(crate[:4], crate='A')
+    for root in crate[4:]:
+        topo.update(root, crate='B')
+
+    assert topo.find(1, 0, 0) is None
+    assert topo.find(1, 0, 0, crate='A').root is crate[0]
+    assert [e.root for e in topo.select(crate='B', bay=0)] == crate[4:6]
+
+def test_board_moved(crate):
+    topo = RceG3.CrateTopology(crate)
+    root = crate[0]
+    bsi  = root.emulator.layout['bsiOffset']
+
+    # The board now reports the location of another one, which it replaces
+    root.emulator._setWords(bsi + 0x148, (2 << 16) | (1 << 8) | 2, 1)
+    topo.update(root, refresh=True)
+
+    assert topo.find(1, 0, 0) is None
+    assert topo.find(2, 1, 2).root is root
+    assert len(topo) == 7
+
+def test_watchdog_changes(crate):
+    topo   = RceG3.CrateTopology(crate)
+    target = types.SimpleNamespace(root=crate[3])
+
+    topo.onWatchdogChange(target, 'Alive', 'Stalled')
+    assert topo.find(1, 1, 2) is None
+    topo.onWatchdogChange(target, 'Stalled', 'Alive')
+    assert topo.find(1, 1, 2).root is crate[3]
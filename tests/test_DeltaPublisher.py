@@ -0,0 +1,69 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import numpy as np
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from RceG3._DeltaPublisher import DeltaFilter, DeltaPublisher  # noqa: E402
+
+def test_filter_drops_unchanged():
+    f = DeltaFilter()
+    assert f.changed('Root.Dev.A', 1)
+    assert not f.changed('Root.Dev.A', 1)
+    assert f.changed('Root.Dev.A', 2)
+    assert f.changed('Root.Dev.B', 2)
+    assert (f.sent, f.suppressed) == (3, 1)
+    assert f.reduction() == 4 / 3
+
+def test_filter_deadband():
+    f = DeltaFilter(deadband=0.5)
+    assert f.changed('A', 1.0)
+    assert not f.changed('A', 1.4)
+    assert f.changed('A', 1.6)
+    assert not f.changed('A', 1.2)
+
+def test_filter_arrays():
+    f = DeltaFilter()
+    assert f.changed('A', np.array([1, 2]))
+    assert not f.changed('A', np.array([1, 2]))
+    assert f.changed('A', np.array([1, 3]))
+
+class Root(object):
+    """Variable listener registration of a root without devices"""
+    path    = 'Root'
+    devices = {}
+    variables = {}
+
+    def addVarListener(self, func, done):
+        self.func = func
+        self.done = done
+
+    def update(self, **values):
+        for path, value in values.items():
+            self.func(path.replace('_', '.'), types.SimpleNamespace(value=value))
+        self.done()
+
+def test_publisher_batches_changes_per_device():
+    root = Root()
+    pub  = DeltaPublisher(root)
+    msgs = []
+    pub.subscribe(msgs.append)
+
+    root.update(Root_Dev_A=1, Root_Dev_B=2, Root_Other_C=3)
+    root.update(Root_Dev_A=1, Root_Dev_B=5, Root_Other_C=3)
+    root.update(Root_Dev_A=1, Root_Dev_B=5, Root_Other_C=3)
+
+    assert [(m['device'], m['values']) for m in msgs] == [
+        ('Root.Dev', {'A': 1, 'B': 2}), ('Root.Other', {'C': 3}), ('Root.Dev', {'B': 5})]
+    assert not any(m['full'] for m in msgs)
+    assert (pub.filter.sent, pub.filter.suppressed) == (4, 5)
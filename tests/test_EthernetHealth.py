@@ -0,0 +1,54 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import numpy as np
+import pytest
+
+pytest.importorskip('pyrogue')
+
+def poll(eth, dt=1.0, **counts):
+    """Run the health update for counter deltas by name"""
+    delta = np.zeros(len(eth._counters.names), dtype=np.uint64)
+    for name, value in counts.items():
+        delta[eth._counters.index[name]] = value
+    eth._health.update(types.SimpleNamespace(delta=delta, dt=dt))
+    return eth.health()
+
+def test_crc_ratio_hysteresis(emulatorRoot):
+    eth = emulatorRoot().RceEthernet
+
+    # Raised at 1e-6, held above 1e-7, cleared at 1e-7
+    assert poll(eth, RxEnCount=10**7, RxCrcErrorCount=20)['CrcErrorRatio']['alarm']
+    assert poll(eth, RxEnCount=10**7, RxCrcErrorCount=5)['CrcErrorRatio']['alarm']
+    assert eth.HealthAlarm.value()
+    assert not poll(eth, RxEnCount=10**7, RxCrcErrorCount=1)['CrcErrorRatio']['alarm']
+    assert not eth.HealthAlarm.value()
+
+    # Between the levels does not raise a cleared alarm
+    assert not poll(eth, RxEnCount=10**7, RxCrcErrorCount=5)['CrcErrorRatio']['alarm']
+
+def test_event_rates(emulatorRoot):
+    eth = emulatorRoot().RceEthernet
+    st  = poll(eth, dt=2.0, RxFifoDropCount=4, TxLocalFaultCount=1, AlignmentCount=3)
+
+    assert st['FifoDropRate'] == {'value': 2.0, 'alarm': True}
+    assert st['LinkFaultRate'] == {'value': 2.0, 'alarm': True}
+    assert st['OverflowRate'] == {'value': 0.0, 'alarm': False}
+    assert eth.FifoDropRateAlarm.value()
+
+def test_no_update_without_interval(emulatorRoot):
+    eth = emulatorRoot().RceEthernet
+    assert not poll(eth, dt=0.0, RxFifoDropCount=4)['FifoDropRate']['alarm']
+
+def test_threshold_order(emulatorRoot):
+    health = emulatorRoot().RceEthernet._health
+    with pytest.raises(ValueError):
+        health.setThreshold('CrcErrorRatio', 1.0e-7, 1.0e-6)
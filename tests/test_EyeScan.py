@@ -0,0 +1,63 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+from RceG3._EyeScan import EyeScan, EyeScanTaps
+
+def scan(cleanTaps):
+    """(lanes x taps) errors and idle with the given clean taps per lane"""
+    errors = np.full((len(cleanTaps), EyeScanTaps), 100, dtype=np.uint32)
+    idle   = np.zeros((len(cleanTaps), EyeScanTaps), dtype=np.uint32)
+    for lane, taps in enumerate(cleanTaps):
+        errors[lane, list(taps)] = 0
+        idle[lane, list(taps)]   = 0xFFFF
+    return errors, idle
+
+def test_center_of_widest_window():
+    eye = EyeScan(*scan([list(range(2, 5)) + list(range(10, 21))]))
+    assert eye.taps.tolist() == [15]
+    assert eye.widths.tolist() == [11]
+
+def test_even_window_takes_lower_center():
+    eye = EyeScan(*scan([range(8, 12)]))
+    assert eye.taps.tolist() == [9]
+    assert eye.widths.tolist() == [4]
+
+def test_window_at_edges():
+    eye = EyeScan(*scan([range(0, 3), range(EyeScanTaps - 5, EyeScanTaps)]))
+    assert eye.taps.tolist() == [1, EyeScanTaps - 3]
+    assert eye.widths.tolist() == [3, 5]
+
+def test_no_clean_tap():
+    eye = EyeScan(*scan([[]]))
+    assert eye.taps.tolist() == [-1]
+    assert eye.widths.tolist() == [0]
+
+def test_min_idle():
+    errors, idle = scan([range(4, 20)])
+    idle[0, 4:10] = 1
+    assert EyeScan(errors, idle).taps.tolist() == [11]
+    assert EyeScan(errors, idle, minIdle=2).taps.tolist() == [14]
+
+def test_first_of_equal_windows():
+    eye = EyeScan(*scan([list(range(2, 6)) + list(range(20, 24))]))
+    assert eye.taps.tolist() == [3]
+
+def test_dpm_eye_scan(emulatorRoot):
+    pytest.importorskip('pyrogue')
+    root = emulatorRoot(timing='dpm', eye=(8, 20))
+    scan = root.DpmTiming.eyeScan(dwell=0)
+
+    assert scan.taps.tolist() == [14, 14]
+    assert scan.widths.tolist() == [13, 13]
+    assert root.DpmTiming.RxDelay0.get() == 14
+    assert root.DpmTiming.RxDelay1.get() == 14
@@ -0,0 +1,91 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import pytest
+
+pr = pytest.importorskip('pyrogue')
+
+import RceG3._HeartBeatWatchdog as hbw  # noqa: E402
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+class Target(object):
+    """HeartBeat source, value None fails the read"""
+    def __init__(self, name, value=0):
+        self.path  = name
+        self.value = value
+        self.HeartBeat = types.SimpleNamespace(_block=self, value=lambda: self.value)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+
+    def check(block):
+        if block.value is None:
+            raise RuntimeError('No response')
+
+    monkeypatch.setattr(hbw.time, 'time', clock.time)
+    monkeypatch.setattr(pr, 'startTransaction', lambda block, type=None: None)
+    monkeypatch.setattr(pr, 'checkTransaction', check)
+    return clock
+
+def step(watchdog, clock, dt, **values):
+    clock.now += dt
+    for t in watchdog.targets:
+        if t.path in values:
+            t.value = values[t.path]
+    watchdog.poll()
+    return watchdog.status()
+
+def test_alive_and_no_progress(clock):
+    wd = hbw.HeartBeatWatchdog([Target('A')], window=1.0)
+    assert step(wd, clock, 0.0, A=100) == {'A': 'Alive'}
+    assert step(wd, clock, 0.5, A=200) == {'A': 'Alive'}
+    assert step(wd, clock, 0.6, A=200) == {'A': 'Alive'}
+    assert step(wd, clock, 0.6, A=200) == {'A': 'NoProgress'}
+    assert step(wd, clock, 0.1, A=300) == {'A': 'Alive'}
+
+def test_restart_and_wrap(clock):
+    wd = hbw.HeartBeatWatchdog([Target('A')], window=1.0)
+    step(wd, clock, 0.0, A=0xFFFFFF00)
+    step(wd, clock, 0.1, A=0xFFFFFF80)
+
+    # A wrap matching the increment rate is progress
+    assert step(wd, clock, 0.1, A=0x00000000) == {'A': 'Alive'}
+    assert wd.state['restarts'][0] == 0
+
+    assert step(wd, clock, 0.1, A=0x10) == {'A': 'Alive'}
+    assert step(wd, clock, 0.1, A=0x5) == {'A': 'Restarted'}
+    assert step(wd, clock, 1.1, A=0x100) == {'A': 'Alive'}
+    assert wd.state['restarts'][0] == 1
+
+def test_stalled_after_reads_fail(clock):
+    wd = hbw.HeartBeatWatchdog([Target('A')], window=1.0)
+    step(wd, clock, 0.0, A=1)
+    assert step(wd, clock, 0.5, A=None) == {'A': 'Alive'}
+    assert step(wd, clock, 0.6, A=None) == {'A': 'Stalled'}
+    assert wd.state['errors'][0] == 2
+
+def test_never_answering_target_stalls(clock):
+    changes = []
+    wd = hbw.HeartBeatWatchdog([Target('A', None), Target('B', 1)], window=1.0,
+                               onChange=lambda t, old, new: changes.append((t.path, old, new)))
+
+    assert step(wd, clock, 0.0) == {'A': 'Unknown', 'B': 'Alive'}
+    assert step(wd, clock, 0.9) == {'A': 'Unknown', 'B': 'Alive'}
+    assert step(wd, clock, 0.2) == {'A': 'Stalled', 'B': 'NoProgress'}
+    assert ('A', 'Unknown', 'Stalled') in changes
+    assert wd.counts()['Stalled'] == 1
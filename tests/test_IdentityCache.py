@@ -0,0 +1,42 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+from RceG3._IdentityCache import IdentityCache
+
+def test_key_covers_firmware():
+    key = IdentityCache.key(0x1234, 0xC0DE0100, 0xABC)
+    assert key != IdentityCache.key(0x1234, 0xC0DE0101, 0xABC)
+    assert key != IdentityCache.key(0x1234, 0xC0DE0100, 0xABD)
+    assert key != IdentityCache.key(0x1235, 0xC0DE0100, 0xABC)
+
+def test_put_get(tmp_path):
+    path  = str(tmp_path / 'identity.json')
+    cache = IdentityCache(path)
+    key   = IdentityCache.key(1, 2, 3)
+
+    assert cache.get(key) is None
+    cache.put(key, {'EFuseValue': 5})
+    assert cache.get(key) == {'EFuseValue': 5}
+    assert IdentityCache(path).get(key) == {'EFuseValue': 5}
+
+def test_put_merges_other_writers(tmp_path):
+    path = str(tmp_path / 'identity.json')
+    a, b = IdentityCache(path), IdentityCache(path)
+    a.get('x')
+
+    b.put('k1', {'EFuseValue': 1})
+    a.put('k2', {'EFuseValue': 2})
+    assert IdentityCache(path).get('k1') == {'EFuseValue': 1}
+    assert IdentityCache(path).get('k2') == {'EFuseValue': 2}
+
+def test_corrupt_file_is_empty(tmp_path):
+    path = tmp_path / 'identity.json'
+    path.write_text('{not json')
+    assert IdentityCache(str(path)).get('k') is None
@@ -0,0 +1,89 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+import RceG3
+
+# Cold first device access, as in benchmarks/RceG3Benchmark.py
+ImportBudget = 0.05  # Time spent in RceG3 modules (s)
+DeviceBudget = 1.0   # Time from import to the device class, dependencies included (s)
+
+DependencyProbe = '''
+import json, time
+t0 = time.perf_counter()
+import numpy, pyrogue, rogue.interfaces.memory
+t1 = time.perf_counter()
+print(json.dumps({'dependency_s': t1 - t0}))
+'''
+
+DeviceProbe = '''
+import json, sys, time
+t0 = time.perf_counter()
+import RceG3
+RceG3.DpmTiming
+t1 = time.perf_counter()
+print(json.dumps({'device_s': t1 - t0, 'parse_loaded': 'parse' in sys.modules}))
+'''
+
+def probe(code):
+    """Output of code run in a fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    return json.loads(subprocess.check_output([sys.executable, '-c', code], env=env))
+
+def loaded(code):
+    """Modules loaded by code in a fresh interpreter, of RceG3 and its dependencies"""
+    return set(probe(f'import json, sys\n{code}\n'
+                     'print(json.dumps(sorted(m for m in sys.modules '
+                     "if m.split('.')[0] in ('RceG3', 'numpy', 'pyrogue', 'rogue', 'parse'))))"))
+
+def test_package_import_loads_nothing():
+    assert loaded('import RceG3') == {'RceG3'}
+
+def test_name_loads_its_module_only():
+    assert loaded('import RceG3; RceG3.IdentityCache') == {'RceG3', 'RceG3._IdentityCache'}
+
+def test_numpy_module_does_not_load_pyrogue():
+    mods = loaded('import RceG3; RceG3.EyeScan')
+    assert 'RceG3._EyeScan' in mods
+    assert not any(m.split('.')[0] in ('pyrogue', 'rogue') for m in mods)
+
+def test_device_does_not_load_parse():
+    pytest.importorskip('pyrogue')
+    mods = loaded('import RceG3; RceG3.RceVersion')
+    assert 'RceG3._RceVersion' in mods
+    assert 'parse' not in mods
+
+def test_device_import_budget():
+    pytest.importorskip('pyrogue')
+    runs = [probe(DeviceProbe) for _ in range(3)]
+    deps = min(probe(DependencyProbe)['dependency_s'] for _ in range(3))
+    device = min(r['device_s'] for r in runs)
+
+    assert not any(r['parse_loaded'] for r in runs)
+    assert device <= DeviceBudget
+    assert device - deps <= ImportBudget
+
+def test_unknown_name():
+    with pytest.raises(AttributeError):
+        RceG3.NoSuchName
+
+def test_names_listed():
+    assert set(RceG3.__all__) <= set(dir(RceG3))
+    assert 'RceVersion' in RceG3.__all__
+
+def test_every_name_resolves():
+    pytest.importorskip('pyrogue')
+    for name in RceG3.__all__:
+        getattr(RceG3, name)
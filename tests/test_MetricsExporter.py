@@ -0,0 +1,65 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import threading
+import time
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from RceG3._MetricsExporter import MetricsExporter, SnapshotCache, metricName  # noqa: E402
+
+def test_metric_name():
+    assert metricName('RxCrcErrorCount') == 'rceg3_rx_crc_error_count'
+    assert metricName('DpmTiming', 'RxCount0') == 'rceg3_dpm_timing_rx_count0'
+
+def test_cache_shared_by_concurrent_callers():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return len(calls)
+
+    cache   = SnapshotCache(slow, maxAge=10.0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get()[0])) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [1] * 8
+
+def test_cache_expires_and_keeps_errors():
+    state = {'fail': True}
+
+    def func():
+        if state['fail']:
+            raise RuntimeError('read failed')
+        return 'ok'
+
+    cache = SnapshotCache(func, maxAge=0.0)
+    with pytest.raises(RuntimeError):
+        cache.get()
+
+    state['fail'] = False
+    time.sleep(0.001)
+    assert cache.get()[0] == 'ok'
+
+def test_render(emulatorRoot):
+    root = emulatorRoot(name='Rce0', location=(2, 1, 0))
+    exp  = MetricsExporter([root])
+    text = exp.render()
+
+    assert 'rceg3_up{root="Rce0",slot="2",bay="1",element="0"' in text
+    assert '# TYPE rceg3_up gauge' in text
+    assert 'rceg3_rx_en_count' in text
@@ -0,0 +1,40 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pytest
+
+pytest.importorskip('pyrogue')
+
+from RceG3._PollCoalescer import byteRange  # noqa: E402
+
+def test_byte_range(emulatorRoot):
+    dev = emulatorRoot().DpmTiming
+    assert byteRange(dev.RxErrors0) == (0x0C, 0x10)
+    assert byteRange(dev.RxIdle0) == (0x0C, 0x10)
+    assert byteRange(dev.RxCount0) == (0x24, 0x28)
+
+def test_dpm_timing_plan(emulatorRoot):
+    dev  = emulatorRoot().DpmTiming
+    plan = dev._pollPlan
+    rate = dev._rates.pollInterval
+
+    assert sorted(plan.groups) == sorted([
+        (1, 0x0C, 0x10, ['RxErrors0', 'RxIdle0']),
+        (1, 0x1C, 0x20, ['RxErrors1', 'RxIdle1']),
+        (rate, 0x24, 0x30, ['RxCount0', 'RxCount1', 'TxCount']),
+    ])
+    assert (plan.naive, plan.merged) == (5, 3)
+    assert plan.saved == pytest.approx(2 / rate)
+    assert dev.PollSaved.value() == pytest.approx(plan.saved)
+
+def test_coalesced_counters_read(emulatorRoot):
+    dev  = emulatorRoot().DpmTiming
+    snap = dev.snapshot()
+    assert [dev.RxCount0.value(), dev.RxCount1.value(), dev.TxCount.value()] == list(snap.values)
@@ -0,0 +1,99 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pytest
+
+pr = pytest.importorskip('pyrogue')
+
+from RceG3._Profiler import LatencyHistogram, Profiler, _TransactionHook  # noqa: E402
+
+def test_bucket_bounds():
+    # Every value falls in a bucket no wider than 1/16 of its lowest value
+    for ns in list(range(0, 100)) + [1000, 12345, 10**6, 10**9, 2**39]:
+        idx = LatencyHistogram.index(ns)
+        assert LatencyHistogram.lowest(idx) <= ns < LatencyHistogram.lowest(idx + 1)
+        assert LatencyHistogram.lowest(idx + 1) - LatencyHistogram.lowest(idx) <= max(1, ns // 16)
+
+def test_exact_below_sub_buckets():
+    assert [LatencyHistogram.index(ns) for ns in range(32)] == list(range(32))
+
+def test_clamped_at_max():
+    hist = LatencyHistogram()
+    hist.record(2**50)
+    assert hist.counts[-1] == 1
+
+def test_statistics():
+    hist = LatencyHistogram()
+    for ns in range(1, 1001):
+        hist.record(ns * 1000)
+
+    assert hist.count == 1000
+    assert hist.min == 1000
+    assert hist.max == 10**6
+    assert hist.total == 1000 * 500500
+    assert abs(hist.percentile(50) - 500000) <= 500000 / 16
+    assert abs(hist.percentile(99) - 990000) <= 990000 / 16
+
+    hist.reset()
+    assert hist.count == 0
+    assert hist.percentile(50) == 0
+
+class Block(object):
+    pass
+
+@pytest.fixture
+def transactions(monkeypatch):
+    """Record the blocks passed to the pyrogue transaction functions"""
+    calls = []
+    monkeypatch.setattr(pr, 'startTransaction', lambda block, **kwargs: calls.append(('start', block)))
+    monkeypatch.setattr(pr, 'checkTransaction', lambda block: calls.append(('check', block)))
+    return calls
+
+def hooked(profiler, blocks):
+    profiler._blocks = {id(b): ('Dev', f'Block[{i}]', 'block') for i, b in enumerate(blocks)}
+    _TransactionHook.install(profiler, profiler._blocks)
+    profiler._enabled = True
+
+def transact(*blocks):
+    for b in blocks:
+        pr.startTransaction(b)
+        pr.checkTransaction(b)
+
+def test_hook_scoped_to_blocks(transactions):
+    start, check = pr.startTransaction, pr.checkTransaction
+    a, b, other = Block(), Block(), Block()
+
+    prof = Profiler()
+    hooked(prof, [a, b])
+    transact(a, other)
+    prof.disable()
+
+    assert [e['name'] for e in prof.report()] == ['Block[0]']
+    assert transactions == [('start', a), ('check', a), ('start', other), ('check', other)]
+    assert (pr.startTransaction, pr.checkTransaction) == (start, check)
+
+def test_nested_profilers_any_order(transactions):
+    start, check = pr.startTransaction, pr.checkTransaction
+    a, b = Block(), Block()
+
+    outer, inner = Profiler(), Profiler()
+    hooked(outer, [a, b])
+    hooked(inner, [b])
+
+    # The outer profiler is disabled first, the inner one keeps timing
+    outer.disable()
+    transact(a, b)
+    assert pr.startTransaction is not start
+    assert [e['name'] for e in inner.report()] == ['Block[0]']
+    assert outer.report() == []
+
+    inner.disable()
+    assert (pr.startTransaction, pr.checkTransaction) == (start, check)
+    assert _TransactionHook._owners == {}
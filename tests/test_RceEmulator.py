@@ -0,0 +1,78 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import time
+import pytest
+
+pytest.importorskip('pyrogue')
+
+import RceG3  # noqa: E402
+
+def test_devices_of_layout(emulatorRoot):
+    dpm = emulatorRoot(name='Dpm', timing='dpm')
+    dtm = emulatorRoot(name='Dtm', timing='dtm', layout='zynquplus')
+
+    assert set(dpm.devices) >= {'RceVersion', 'RceBsi', 'RceEthernet', 'DpmTiming'}
+    assert 'DtmTiming' in dtm.devices
+    assert 'RceEthernet' not in dtm.devices
+
+def test_version_registers(emulatorRoot):
+    root = emulatorRoot(location=(3, 2, 1), imageName='TestImage', seed=1)
+    ver  = root.RceVersion
+
+    assert ver.FpgaVersion.get() == 0xC0DE0100
+    assert ver.ImageName.get() == 'TestImage'
+    assert ver.GitHashShort.get() == RceG3.gitHashShort(ver.GitHash.get())
+    assert (root.RceBsi.AtcaSlot.get(), root.RceBsi.CobBay.get(), root.RceBsi.CobElement.get()) == (3, 2, 1)
+
+def test_scratch_pad(emulatorRoot):
+    ver = emulatorRoot().RceVersion
+    ver.ScratchPad.set(0x12345678)
+    assert ver.ScratchPad.get() == 0x12345678
+
+def test_heart_beat_advances(emulatorRoot):
+    ver   = emulatorRoot().RceVersion
+    first = ver.HeartBeat.get()
+    time.sleep(0.01)
+    assert ver.HeartBeat.get() != first
+
+def test_ethernet_snapshot(emulatorRoot):
+    eth  = emulatorRoot(counterRate=1.0e5).RceEthernet
+    time.sleep(0.01)
+    snap = eth.snapshot()
+
+    assert len(snap) == len(eth._counters.names)
+    assert snap['RxEnCount'] > 0
+
+def test_count_reset_restarts_rates(emulatorRoot):
+    eth = emulatorRoot(counterRate=1.0e5).RceEthernet
+    eth._rates.poll()
+    time.sleep(0.02)
+    eth._rates.poll()
+    before = eth._rates.totals()['RxEnCount']
+
+    eth.CountReset()
+    eth._rates.poll()
+
+    # The cleared counters continue the totals instead of wrapping them
+    after = eth._rates.totals()['RxEnCount']
+    assert before <= after < 1 << 32
+
+def test_rates_polled_only_where_counters_were(emulatorRoot):
+    root = emulatorRoot()
+    assert root.RceEthernet.CounterTime.pollInterval == 0
+    assert root.DpmTiming.CounterTime.pollInterval == 1
+    assert emulatorRoot(timing='dtm').DtmTiming.CounterTime.pollInterval == 0
+
+def test_ethernet_error_counters_saturate(emulatorRoot):
+    eth = emulatorRoot().RceEthernet
+    sat = dict(zip(eth._counters.names, eth._counters.saturating))
+    assert not sat['RxEnCount'] and not sat['TxEnCount']
+    assert sat['RxCrcErrorCount'] and sat['RxFifoDropCount']
@@ -0,0 +1,43 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pytest
+
+pytest.importorskip('pyrogue')
+
+import RceG3  # noqa: E402
+
+def test_sweep_keeps_every_target(emulatorRoot):
+    # Two boards reporting the same location must both be returned
+    roots = [emulatorRoot(name=f'Rce{i}', location=(2, 1, 0), seed=i) for i in range(2)]
+    roots.append(emulatorRoot(name='Rce2', timing='dtm', location=(3, 0, 0), seed=2))
+
+    with RceG3.RceFleet(roots) as fleet:
+        results = fleet.sweep()
+
+    assert [r.root for r in results] == roots
+    assert all(r.ok for r in results)
+    assert [r.location for r in results] == [(2, 1, 0), (2, 1, 0), (3, 0, 0)]
+    assert 'Rce2.DtmTiming' in results[2].values
+
+def test_by_location(emulatorRoot):
+    roots = [emulatorRoot(name=f'Rce{i}', location=(2, 1, 0), seed=i) for i in range(2)]
+    roots.append(emulatorRoot(name='Rce2', location=(3, 0, 0), seed=2))
+
+    with RceG3.RceFleet(roots) as fleet:
+        groups = fleet.sweep().byLocation()
+
+    assert list(groups) == [(2, 1, 0), (3, 0, 0)]
+    assert [r.root for r in groups[(2, 1, 0)]] == roots[:2]
+    assert [r.root for r in groups[(3, 0, 0)]] == roots[2:]
+
+def test_by_location_without_location():
+    results = RceG3.FleetResults([RceG3.FleetResult('a', location=(1, 2, 3)), RceG3.FleetResult('b')])
+    assert {k: [r.root for r in v] for k, v in results.byLocation().items()} == {(1, 2, 3): ['a'], None: ['b']}
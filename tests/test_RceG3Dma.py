@@ -0,0 +1,79 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import types
+import numpy as np
+import pytest
+
+pr = pytest.importorskip('pyrogue')
+
+import RceG3  # noqa: E402
+
+class DmaRoot(pr.Root):
+    """DMA engines on the register emulator, unmapped registers read 0"""
+    def __init__(self, **kwargs):
+        super().__init__(name='DmaRoot', pollEn=False)
+        self.emulator = RceG3.RceEmulator()
+        self.addInterface(self.emulator)
+        self.add(RceG3.RceG3Dma(memBase=self.emulator, **kwargs))
+
+@pytest.mark.parametrize('mode, useDmaEth, channels', [
+    ('AxisV2', True,  [0, 1, 2]),
+    ('AxisV2', False, [0, 1, 2, 3]),
+    ('Ppi',    True,  [0, 1, 2, 3]),
+])
+def test_channels(mode, useDmaEth, channels):
+    dma = RceG3.RceG3Dma(mode=mode, useDmaEth=useDmaEth)
+    assert [d.name for d in dma.channels()] == [f'Channel[{i}]' for i in channels]
+    assert [d.offset for d in dma.channels()] == [2*i*0x10000 for i in channels]
+    assert dma.offset == RceG3.DmaAxilBase[mode]
+
+def test_base():
+    dma = RceG3.RceG3Dma(base=0xA4010000, channels=[1])
+    assert dma.offset == 0xA4010000
+    assert [d.name for d in dma.channels()] == ['Channel[1]']
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        RceG3.RceG3Dma(mode='Queue4x2')
+
+@pytest.mark.parametrize('mode', ['AxisV2', 'Ppi'])
+def test_registers_read_only(mode):
+    for chan in RceG3.RceG3Dma(mode=mode).channels():
+        for v in chan.variables.values():
+            if isinstance(v, pr.RemoteVariable) and not isinstance(v, pr.BaseCommand):
+                assert v.mode == 'RO', v.name
+
+def test_ppi_counters_saturate():
+    for chan in RceG3.RceG3Dma(mode='Ppi').channels():
+        assert chan._counters.saturating.all()
+    for chan in RceG3.RceG3Dma(mode='AxisV2').channels():
+        assert not chan._counters.saturating.any()
+
+def test_throughput():
+    root = DmaRoot()
+    root.start()
+    try:
+        chan = root.RceG3Dma.Channel[0]
+        root.emulator._setWords(RceG3.DmaAxilBase['AxisV2'] + 0x28, 4096, 1)
+        chan.MaxSize.get()
+
+        delta = np.zeros(len(chan._counters.names), dtype=np.uint64)
+        delta[chan._counters.index['HwWrIndex']] = 100
+        delta[chan._counters.index['HwRdIndex']] = 3000
+        chan._throughput.update(types.SimpleNamespace(delta=delta, dt=2.0))
+
+        st = chan.throughput()
+        assert st['IbFrameRate'] == 50.0
+        assert st['IbThroughput'] == 50.0 * 4096 / 1.0e6
+        assert st['ObRingDepth'] == 3000
+        assert st['RingAliased']
+    finally:
+        root.stop()
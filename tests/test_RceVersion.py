@@ -0,0 +1,102 @@
+#-----------------------------------------------------------------------------
+# This file is part of the RCE GEN3 firmware platform. It is subject to
+# the license terms in the LICENSE.txt file found in the top-level directory
+# of this distribution and at:
+#    https://confluence.slac.stanford.edu/display/ppareg/LICENSE.html.
+# No part of the rogue RCE GEN3 firmware platform, including this file, may be
+# copied, modified, propagated, or distributed except according to the terms
+# contained in the LICENSE.txt file.
+#-----------------------------------------------------------------------------
+
+import pytest
+
+pr = pytest.importorskip('pyrogue')
+
+import RceG3  # noqa: E402
+
+class CachedRoot(pr.Root):
+    """Emulated RceVersion with an identity cache"""
+    def __init__(self, path, **kwargs):
+        super().__init__(name='CachedRoot', pollEn=False)
+        self.emulator = RceG3.RceEmulator(**kwargs)
+        self.addInterface(self.emulator)
+        self.add(RceG3.RceVersion(memBase=self.emulator, identityCache=path, **self.emulator.layout))
+
+def countReads(monkeypatch, dev):
+    """Offsets of the raw reads of dev"""
+    reads = []
+    rawRead = dev._rawRead
+
+    def _rawRead(offset, numWords=1, **kwargs):
+        reads.append(offset)
+        return rawRead(offset=offset, numWords=numWords, **kwargs)
+
+    monkeypatch.setattr(dev, '_rawRead', _rawRead)
+    return reads
+
+def test_status(emulatorRoot):
+    root = emulatorRoot(location=(4, 3, 2), imageName='StatusImage', seed=5)
+    st   = root.RceVersion.status()
+
+    assert st.FpgaVersion == 0xC0DE0100
+    assert (st.AtcaSlot, st.CobBay, st.CobElement) == (4, 3, 2)
+    assert st.ImageName == 'StatusImage'
+    assert st.GitHashShort == RceG3.gitHashShort(st.GitHash)
+    assert st.SerialNumber == root.RceBsi.SerialNumber.get()
+    assert dict(st.table())['AtcaSlot'] == '4'
+
+def test_status_serves_bsi_from_cache(emulatorRoot, monkeypatch):
+    root  = emulatorRoot(location=(4, 3, 2))
+    ver   = root.RceVersion
+    bsi   = root.emulator.layout['bsiOffset']
+    reads = countReads(monkeypatch, ver)
+
+    # A board swap is only seen after refreshBsi()
+    root.emulator._setWords(bsi + 0x148, (5 << 16) | (1 << 8), 1)
+    assert ver.status().AtcaSlot == 4
+    assert not [r for r in reads if r >= bsi]
+
+    ver.refreshBsi()
+    assert (ver.status().AtcaSlot, ver.CobBay.value()) == (5, 1)
+
+def test_status_identity_from_cache(tmp_path, monkeypatch):
+    root = CachedRoot(str(tmp_path / 'identity.json'), seed=7)
+    root.start()
+    try:
+        ver   = root.RceVersion
+        eFuse = ver.EFuseValue.value()
+        reads = countReads(monkeypatch, ver)
+        st    = ver.status()
+
+        # Only the internal registers are read, not the BuildStamp
+        assert reads == [root.emulator.layout['intOffset']]
+        assert st.EFuseValue == eFuse
+        assert st.ImageName == 'DpmEmulator'
+    finally:
+        root.stop()
+
+def test_decode_build_stamp_once(monkeypatch):
+    pytest.importorskip('parse')
+
+    # A device without a root, so no variable update decodes in the background
+    dev   = RceG3.RceVersion()
+    stamp = RceG3.BuildStampFormat.format(ImageName='DecodeImage', BuildEnv='Vivado', BuildServer='server',
+                                          BuildDate='today', Builder='emulator')
+
+    calls  = []
+    parser = RceG3._RceVersion.buildStampParser()
+    monkeypatch.setattr(RceG3._RceVersion, 'buildStampParser', lambda: calls.append(1) or parser)
+
+    fields = dev.decodeBuildStamp(stamp)
+    assert fields['ImageName'] == 'DecodeImage'
+    assert dev.decodeBuildStamp(stamp) is fields
+    assert len(calls) == 1
+
+    assert dev.decodeBuildStamp('not a stamp') == dict.fromkeys(RceG3.BuildStampFields, '')
+    assert len(calls) == 2
+
+def test_build_stamp_fields(emulatorRoot):
+    pytest.importorskip('parse')
+    dev = emulatorRoot(imageName='FieldImage').RceVersion
+    assert dev.ImageName.get() == 'FieldImage'
+    assert dev.buildInfo()['ImageName'] == 'FieldImage'